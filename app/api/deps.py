@@ -1,10 +1,13 @@
-from typing import Generator, Optional, Dict
+from typing import Generator, Optional, Dict, Callable, Any, Sequence
+import inspect
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from jose import JWTError
+from app.core.config import settings
 from app.core.database import get_db
+from app.core import cache
 from app.core.security import decode_token
 from app.models.models import User, RefreshToken
 from app.crud.crud import user_crud
@@ -13,6 +16,43 @@ from datetime import datetime
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/auth/login")
 
 
+def get_client_ip(request: Request) -> Optional[str]:
+    """
+    Resolve the client IP address, honouring proxy headers.
+    The headers are client-controlled, so use this for display/logging only;
+    rate limits key on get_rate_limit_ip.
+    """
+    # Check X-Forwarded-For first (for proxies/load balancers)
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if forwarded_for:
+        # X-Forwarded-For can contain multiple IPs, take the first one
+        return forwarded_for.split(",")[0].strip()
+    real_ip = request.headers.get("X-Real-IP")
+    if real_ip:
+        return real_ip
+    # Fallback to client host
+    if request.client:
+        return request.client.host
+    return None
+
+
+def get_rate_limit_ip(request: Request) -> Optional[str]:
+    """
+    Resolve the client IP for rate limiting. Unlike get_client_ip this never
+    trusts what the client wrote: with TRUSTED_PROXY_COUNT proxies in front,
+    it takes the X-Forwarded-For entry the outermost trusted proxy appended
+    (counting from the right); otherwise the socket peer address.
+    """
+    hops = settings.TRUSTED_PROXY_COUNT
+    if hops > 0:
+        forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    if request.client:
+        return request.client.host
+    return None
+
+
 def get_device_info(request: Request, device_name: Optional[str] = None) -> Dict[str, Optional[str]]:
     """
     Extract device information from request headers
@@ -24,17 +64,7 @@ def get_device_info(request: Request, device_name: Optional[str] = None) -> Dict
     Returns:
         Dictionary with ipAddress, userAgent, and deviceName
     """
-    # Get IP address - check X-Forwarded-For first (for proxies/load balancers)
-    ip_address = None
-    if request.headers.get("X-Forwarded-For"):
-        # X-Forwarded-For can contain multiple IPs, take the first one
-        ip_address = request.headers.get("X-Forwarded-For").split(",")[0].strip()
-    elif request.headers.get("X-Real-IP"):
-        ip_address = request.headers.get("X-Real-IP")
-    else:
-        # Fallback to client host
-        if request.client:
-            ip_address = request.client.host
+    ip_address = get_client_ip(request)
     
     # Get user agent
     user_agent = request.headers.get("User-Agent")
@@ -83,21 +113,20 @@ def get_current_user(
     if user_id is None or token_type != "access":
         raise credentials_exception
     
-    user = user_crud.get_by_id(db, id=user_id)
-    if user is None:
-        raise credentials_exception
-    
-    # Check if user has at least one valid (non-revoked, non-expired) refresh token
-    # This ensures that if all tokens are revoked via "logout all devices",
-    # the access token is also invalidated immediately
-    now = datetime.utcnow()
-    valid_token_count = db.query(RefreshToken).filter(
-        RefreshToken.userId == user.id,
+    # Load the user and check for at least one valid (non-revoked, non-expired)
+    # refresh token in the same round trip. If all tokens were revoked via
+    # "logout all devices", the access token is invalidated immediately.
+    has_session = db.query(RefreshToken.id).filter(
+        RefreshToken.userId == User.id,
         or_(RefreshToken.revoked == False, RefreshToken.revoked.is_(None)),  # Explicitly handle NULL and False
-        RefreshToken.expiresAt > now
-    ).count()
+        RefreshToken.expiresAt > datetime.utcnow()
+    ).exists().correlate(User)
+    row = db.query(User, has_session.label("has_session")).filter(User.id == user_id).first()
+    if row is None:
+        raise credentials_exception
+    user, session_valid = row
     
-    if valid_token_count == 0:
+    if not session_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session has been revoked. Please login again.",
@@ -184,3 +213,98 @@ def get_current_active_admin(
         )
     return current_user
 
+
+def enforce_rate_limit(key: str, limit: int, window_seconds: int) -> None:
+    """
+    Count a hit against key and raise 429 once more than limit hits land
+    within the window. Counters live in the shared cache, so the limit holds
+    across workers when Redis is configured.
+    """
+    if cache.incr_window(f"ratelimit:{key}", window_seconds) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(window_seconds)},
+        )
+
+
+def rate_limit(scope: str, limit: int, window_seconds: int):
+    """
+    Dependency factory for a per-client-IP rate limit.
+    Rejects excess requests with 429 before the endpoint does any work.
+    """
+    def limiter(request: Request) -> None:
+        enforce_rate_limit(f"{scope}:{get_rate_limit_ip(request) or 'unknown'}", limit, window_seconds)
+    return limiter
+
+
+def invalid_cursor(exc: ValueError) -> HTTPException:
+    """400 for a cursor that get_multi rejected"""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=str(exc)
+    )
+
+
+def missing_or_forbidden(crud: Any, db: Session, id: Any, *, name: str, action: str) -> HTTPException:
+    """
+    Error for an ownership-filtered write that matched no row: 403 if the
+    row exists but belongs to someone else, 404 otherwise. The extra lookup
+    only runs on this miss path.
+    """
+    if crud.exists(db, id=id):
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this {name.lower()}"
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{name} not found"
+    )
+
+
+def owned_resource(
+    model,
+    path_param: str,
+    *,
+    name: str,
+    owner_id: Callable[[Any], Optional[str]] = lambda obj: obj.userId,
+    allow_admin: bool = True,
+    lock: bool = False,
+    options: Sequence[Any] = (),
+):
+    """
+    Dependency factory that loads model by the id in path_param and returns
+    it only if it belongs to the current user (or the user is an admin, when
+    allow_admin is set). Raises 404 if missing and 403 if not owned.
+    With lock=True the row is read FOR UPDATE, so a following update or
+    delete works on the row exactly as it was checked.
+    """
+    def dependency(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user),
+        **path_params: str,
+    ):
+        query = db.query(model).options(*options).filter(model.id == path_params[path_param])
+        if lock:
+            query = query.with_for_update(of=model)
+        obj = query.first()
+        if not obj:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{name} not found"
+            )
+        if not (allow_admin and current_user.role == "admin") and owner_id(obj) != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not authorized to access this {name}"
+            )
+        return obj
+
+    # Expose the id under the route's own path parameter name
+    signature = inspect.signature(dependency)
+    dependency.__signature__ = signature.replace(parameters=[
+        *(p for p in signature.parameters.values() if p.kind is not inspect.Parameter.VAR_KEYWORD),
+        inspect.Parameter(path_param, inspect.Parameter.KEYWORD_ONLY, annotation=str),
+    ])
+    return dependency
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, Literal
 from app.core.database import get_db
 from app.api.deps import get_current_active_user, get_current_active_admin
 from app.schemas.schemas import (
@@ -14,6 +15,9 @@ from app.models.models import User
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_COUNTRY_RESPONSE_FIELDS = tuple(CountryResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_countries(
@@ -21,7 +25,7 @@ def list_countries(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("asc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("asc"),
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None)
 ):
@@ -40,13 +44,12 @@ def list_countries(
         order=order,
         filters=filters,
         search=search,
-        search_fields=["name", "code"]
+        search_fields=["name", "code"],
+        columns=_COUNTRY_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [CountryResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{country_id}", response_model=CountryResponse)
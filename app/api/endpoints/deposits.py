@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from datetime import datetime, timezone
 import base64
 import io
@@ -24,6 +25,9 @@ from app.core.config import settings
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_DEPOSIT_RESPONSE_FIELDS = tuple(DepositResponse.model_fields)
+
 
 def _get_user_mt5_account(db: Session, current_user: User, account_identifier: str) -> MT5Account:
     """
@@ -70,7 +74,7 @@ def list_deposits(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     currency: Optional[str] = Query(None),
     method: Optional[str] = Query(None),
@@ -79,13 +83,7 @@ def list_deposits(
     """
     List deposits for current user with pagination and filtering
     """
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if currency:
-        filters["currency"] = currency
-    if method:
-        filters["method"] = method
+    filters = {k: v for k, v in (("status", status), ("currency", currency), ("method", method)) if v}
     
     result = deposit_crud.get_multi(
         db,
@@ -96,13 +94,12 @@ def list_deposits(
         filters=filters,
         search=search,
         search_fields=["transactionHash", "externalTransactionId"],
-        user_id=current_user.id
+        user_id=current_user.id,
+        columns=_DEPOSIT_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [DepositResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{deposit_id}", response_model=DepositResponse)
@@ -1,76 +1,147 @@
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
-import random
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+from typing import Annotated, Optional, Dict, Any, List, Tuple
+from datetime import datetime
+import hmac
+import secrets
 import re
 import logging
-from app.services.email_service import send_email_to
+from html import escape
+from pathlib import Path
+from string import Template
+from app.services.email_service import send_email_to, send_bulk_emails
 from app.core.config import settings
+from app.core.cache import get_cache, incr_window
+from app.api.deps import rate_limit, enforce_rate_limit, get_current_active_admin
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory OTP storage: {email: {"otp": str, "expires_at": datetime, "verified": bool}}
-otp_store: Dict[str, Dict[str, Any]] = {}
+# OTPs live in the shared cache under otp:<email> and expire natively
+OTP_KEY_PREFIX = "otp:"
 OTP_EXPIRY_MINUTES = 10
+# Verify attempts per email within the OTP lifetime; once they are used up the
+# current code is discarded, and requesting a new one doesn't reset the count
+OTP_ATTEMPTS_KEY_PREFIX = "otp-attempts:"
+OTP_MAX_VERIFY_ATTEMPTS = 5
+# Max OTP emails within the window, per client IP and per recipient address
+OTP_RATE_LIMIT_PER_IP = 30
+OTP_RATE_LIMIT_PER_EMAIL = 3
+OTP_RATE_WINDOW_SECONDS = 60
+# Max custom emails within the window, per client IP and per recipient address
+CUSTOM_EMAIL_RATE_LIMIT_PER_IP = 10
+CUSTOM_EMAIL_RATE_LIMIT_PER_RECIPIENT = 3
+CUSTOM_EMAIL_RATE_WINDOW_SECONDS = 60
+# Bulk sends: recipients per request and requests per client IP per window
+MAX_BULK_RECIPIENTS = 100
+BULK_EMAIL_RATE_LIMIT_PER_IP = 5
+
+# Attachment limits for the custom email routes (SMTP providers cap around 25 MB)
+MAX_UPLOAD_FILES = 10
+MAX_UPLOAD_FILE_BYTES = 10 * 1024 * 1024
+MAX_UPLOAD_TOTAL_BYTES = 25 * 1024 * 1024
+
+# Used to derive a plain-text body from custom HTML emails
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
 
 BRAND_PRIMARY = "#6242a5"
 BRAND_PRIMARY_ALT = "#9f8bcf"
 BORDER_COLOR = "#e5e7eb"
 BG_COLOR = "#f9fafb"
 
+# Settings are fixed for the life of the process, resolve them once at import
+_CLIENT_URL = settings.CLIENT_URL
+_CLIENT_URL_NOSLASH = _CLIENT_URL.rstrip("/")
+_EMAIL_LOGO_URL = settings.EMAIL_LOGO_URL or f"{_CLIENT_URL_NOSLASH}/logo.png"
+
 def get_logo_url():
-    if settings.EMAIL_LOGO_URL:
-        return settings.EMAIL_LOGO_URL
-    return f"{settings.CLIENT_URL.rstrip('/')}/logo.png"
+    return _EMAIL_LOGO_URL
+
+# HTML templates are read and parsed once at import. Values that are fixed for
+# the life of the process are folded in up front, so rendering a request only
+# fills the per-recipient holes.
+_TEMPLATE_DIR = Path(__file__).resolve().parents[2] / "templates" / "emails"
+_TEMPLATE_CONSTANTS = {
+    "brand_primary": BRAND_PRIMARY,
+    "brand_primary_alt": BRAND_PRIMARY_ALT,
+    "border_color": BORDER_COLOR,
+    "bg_color": BG_COLOR,
+    "logo_url": escape(get_logo_url()),
+    "dashboard_url": escape(_CLIENT_URL),
+}
+
+def _load_template(filename: str) -> Template:
+    source = Template((_TEMPLATE_DIR / filename).read_text(encoding="utf-8"))
+    # "$$" keeps any literal "$" in the folded values from becoming a placeholder
+    constants = {key: value.replace("$", "$$") for key, value in _TEMPLATE_CONSTANTS.items()}
+    return Template(source.safe_substitute(constants))
+
+_OTP_TPL = _load_template("otp.html")
+_NOTICE_TPL = _load_template("notice.html")
+_WELCOME_TPL = _load_template("welcome.html")
+
+# The notification handlers are async def and render on the event loop. That
+# is fine while templates are fixed-size: a render is a single substitute()
+# of a few short values (~10-15 µs). A template that renders unbounded data
+# (e.g. a table of trades) should be rendered with run_in_threadpool instead.
+def render_email(template: Template, **values: Any) -> str:
+    """Render an email template, HTML-escaping the per-request values"""
+    return template.substitute({key: escape(str(value)) for key, value in values.items()})
+
+def send_email_task(to: str, subject: str, text: str, html: str, attachments: Optional[List[Dict[str, Any]]] = None):
+    """
+    Background task to send an email after the response has been returned
+    """
+    try:
+        send_email_to(to, subject, text, html, attachments=attachments)
+    except Exception as e:
+        logger.error(f"Failed to send email '{subject}' to {to}: {e}")
 
-class OTPEmailRequest(BaseModel):
-    email: EmailStr
+# Lower-cased once at validation, so it can be used directly as a cache key
+NormalizedEmail = Annotated[EmailStr, AfterValidator(str.lower)]
+
+class _EmailReqBase(BaseModel):
+    """Common recipient fields shared by the transactional email requests"""
+    email: NormalizedEmail
     name: Optional[str] = None
 
-class MT5AccountEmailRequest(BaseModel):
-    email: EmailStr
+class OTPEmailRequest(_EmailReqBase):
+    pass
+
+class MT5AccountEmailRequest(_EmailReqBase):
     login: str
     account_name: Optional[str] = None
     group: Optional[str] = None
     leverage: Optional[int] = None
     master_password: Optional[str] = None
     investor_password: Optional[str] = None
-    name: Optional[str] = None
 
-class DepositEmailRequest(BaseModel):
-    email: EmailStr
+class DepositEmailRequest(_EmailReqBase):
     account_login: str
     amount: str
     date: Optional[str] = None
-    name: Optional[str] = None
 
-class WithdrawalEmailRequest(BaseModel):
-    email: EmailStr
+class WithdrawalEmailRequest(_EmailReqBase):
     account_login: str
     amount: str
     date: Optional[str] = None
-    name: Optional[str] = None
 
-class InternalTransferEmailRequest(BaseModel):
-    email: EmailStr
+class InternalTransferEmailRequest(_EmailReqBase):
     from_account: str
     to_account: str
     amount: str
     date: Optional[str] = None
-    name: Optional[str] = None
 
-class WelcomeEmailRequest(BaseModel):
-    email: EmailStr
-    name: Optional[str] = None
+class WelcomeEmailRequest(_EmailReqBase):
+    pass
 
 class EmailResponse(BaseModel):
     success: bool
     message: str
 
 class OTPVerifyRequest(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     otp: str
 
 class OTPVerifyResponse(BaseModel):
@@ -78,26 +149,25 @@ class OTPVerifyResponse(BaseModel):
     verified: bool
     message: str
 
-@router.post("/send-otp", response_model=EmailResponse)
-def send_otp_email(request: OTPEmailRequest):
+@router.post(
+    "/send-otp",
+    response_model=EmailResponse,
+    dependencies=[Depends(rate_limit("send-otp", OTP_RATE_LIMIT_PER_IP, OTP_RATE_WINDOW_SECONDS))],
+)
+def send_otp_email(request: OTPEmailRequest, background_tasks: BackgroundTasks):
+    enforce_rate_limit(f"send-otp:{request.email}", OTP_RATE_LIMIT_PER_EMAIL, OTP_RATE_WINDOW_SECONDS)
     try:
-        otp = str(random.randint(100000, 999999))
-        logo_url = get_logo_url()
+        otp = f"{secrets.randbelow(900_000) + 100_000:06d}"
         name = request.name or ""
         
         # Store OTP with expiration time (10 minutes from now)
-        expires_at = datetime.now() + timedelta(minutes=OTP_EXPIRY_MINUTES)
-        otp_store[request.email.lower()] = {
-            "otp": otp,
-            "expires_at": expires_at,
-            "verified": False
-        }
+        get_cache().set(f"{OTP_KEY_PREFIX}{request.email}", otp, ex=OTP_EXPIRY_MINUTES * 60)
         
         text = f"Hi {name},\n\nUse the one-time code below to verify your email address.\n\n{otp}\n\nThis code will expire in 10 minutes.\n\nIf you didn't request this email, you can safely ignore it.\n\n- Team Zuperior\n"
         
-        html = f'<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"/></head><body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif"><table width="100%" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:12px"><tr><td style="background:linear-gradient(90deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:16px 20px"><img src="{logo_url}" alt="Zuperior" style="height:28px" /><h1 style="margin:0;font-size:20px;color:#fff">Zuperior</h1></td></tr><tr><td style="padding:24px"><p style="margin:0 0 12px 0">Hi {name},</p><p style="margin:0 0 16px 0">Use the one-time code below to verify your email address.</p><div style="letter-spacing:6px;font-weight:700;font-size:28px;text-align:center;margin:18px 0 8px">{otp}</div><p style="margin:0 0 6px 0;font-size:12px;text-align:center">This code will expire in 10 minutes.</p><div style="margin-top:22px;padding:12px 16px;background:#f8f9fa;border-radius:8px;font-size:12px">If you did not request this email, you can safely ignore it.</div><p style="margin-top:24px;font-size:12px">- Team Zuperior</p></td></tr></table></body></html>'
+        html = render_email(_OTP_TPL, name=name, otp=otp)
         
-        send_email_to(request.email, "Verify your email • Zuperior", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Verify your email • Zuperior", text, html)
         return EmailResponse(success=True, message=f"OTP email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending OTP email: {e}")
@@ -108,53 +178,55 @@ def verify_otp(request: OTPVerifyRequest):
     """
     Verify the OTP entered by the user.
     Returns success: true and verified: true if OTP is correct and not expired.
+    After OTP_MAX_VERIFY_ATTEMPTS attempts within the OTP lifetime the code is
+    discarded, so the 6-digit space can't be brute-forced before it expires.
     """
     try:
-        email_lower = request.email.lower()
+        cache = get_cache()
+        key = f"{OTP_KEY_PREFIX}{request.email}"
+        attempts_key = f"{OTP_ATTEMPTS_KEY_PREFIX}{request.email}"
         
-        # Check if OTP exists for this email
-        if email_lower not in otp_store:
+        # Counted before comparing, so concurrent guesses can't exceed the cap
+        if incr_window(attempts_key, OTP_EXPIRY_MINUTES * 60) > OTP_MAX_VERIFY_ATTEMPTS:
+            cache.delete(key)
             return OTPVerifyResponse(
                 success=False,
                 verified=False,
-                message="No OTP found for this email. Please request a new OTP."
+                message="Too many attempts. Please wait a few minutes and request a new OTP."
             )
         
-        otp_data = otp_store[email_lower]
+        stored_otp = cache.get(key)
         
-        # Check if OTP has expired
-        if datetime.now() > otp_data["expires_at"]:
-            # Remove expired OTP
-            del otp_store[email_lower]
+        # Expired OTPs are evicted by the cache, so missing and expired look the same
+        if stored_otp is None:
             return OTPVerifyResponse(
                 success=False,
                 verified=False,
-                message="OTP has expired. Please request a new OTP."
+                message="No valid OTP found for this email. Please request a new OTP."
             )
         
-        # Check if OTP has already been verified
-        if otp_data["verified"]:
+        # Constant-time comparison so response timing doesn't leak matching digits
+        if not hmac.compare_digest(stored_otp.encode(), request.otp.encode()):
             return OTPVerifyResponse(
                 success=False,
                 verified=False,
-                message="This OTP has already been used. Please request a new OTP."
+                message="Invalid OTP. Please check and try again."
             )
         
-        # Verify OTP
-        if otp_data["otp"] == request.otp:
-            # Mark as verified and remove from store (one-time use)
-            del otp_store[email_lower]
-            return OTPVerifyResponse(
-                success=True,
-                verified=True,
-                message="OTP verified successfully."
-            )
-        else:
+        # One-time use: only the request that actually removes the key succeeds
+        if not cache.delete(key):
             return OTPVerifyResponse(
                 success=False,
                 verified=False,
-                message="Invalid OTP. Please check and try again."
+                message="This OTP has already been used. Please request a new OTP."
             )
+        
+        cache.delete(attempts_key)
+        return OTPVerifyResponse(
+            success=True,
+            verified=True,
+            message="OTP verified successfully."
+        )
     
     except Exception as e:
         logger.error(f"Error verifying OTP: {e}")
@@ -164,93 +236,111 @@ def verify_otp(request: OTPVerifyRequest):
         )
 
 @router.post("/send-mt5-account", response_model=EmailResponse)
-def send_mt5_account_email(request: MT5AccountEmailRequest):
+async def send_mt5_account_email(request: MT5AccountEmailRequest, background_tasks: BackgroundTasks):
     try:
         recipient_name = request.name or 'Trader'
-        logo_url = get_logo_url()
-        dashboard_url = settings.CLIENT_URL
         
-        text = f"Hi {recipient_name},\n\nYour new MT5 trading account has been created successfully.\n\nLogin: {request.login}\n"
+        parts = [f"Hi {recipient_name},\n\nYour new MT5 trading account has been created successfully.\n\nLogin: {request.login}\n"]
         if request.account_name:
-            text += f"Account Name: {request.account_name}\n"
+            parts.append(f"Account Name: {request.account_name}\n")
         if request.group:
-            text += f"Group: {request.group}\n"
+            parts.append(f"Group: {request.group}\n")
         if request.leverage:
-            text += f"Leverage: 1:{request.leverage}\n"
+            parts.append(f"Leverage: 1:{request.leverage}\n")
         if request.master_password:
-            text += f"Master Password: {request.master_password}\n"
+            parts.append(f"Master Password: {request.master_password}\n")
         if request.investor_password:
-            text += f"Investor Password: {request.investor_password}\n"
-        text += "\nYou can now sign in to the MT5 platform and start trading.\n\nBest regards,\nZuperior\n"
-        
-        html = f'<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"/></head><body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif"><table width="100%" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:16px"><tr><td style="background:linear-gradient(90deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:24px"><img src="{logo_url}" alt="Zuperior" style="height:28px" /><div style="font-size:20px;color:#fff;font-weight:700">Zuperior</div><div style="font-size:13px;color:rgba(255,255,255,0.85)">MT5 Account Created</div></td></tr><tr><td style="padding:24px"><div style="font-size:16px;font-weight:600">Hi {recipient_name},</div><p style="margin:8px 0;font-size:14px">Your new MT5 account has been created successfully.</p></td></tr><tr><td align="center" style="padding:0 24px 28px"><a href="{dashboard_url}" style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;text-decoration:none;font-weight:600;padding:12px 18px;border-radius:10px">Open Dashboard</a></td></tr><tr><td style="background:#fafafa;padding:14px 24px;font-size:12px;border-top:1px solid {BORDER_COLOR}">© {datetime.now().year} Zuperior. All rights reserved</td></tr></table></body></html>'
+            parts.append(f"Investor Password: {request.investor_password}\n")
+        parts.append("\nYou can now sign in to the MT5 platform and start trading.\n\nBest regards,\nZuperior\n")
+        text = "".join(parts)
+        
+        html = render_email(
+            _NOTICE_TPL,
+            name=recipient_name,
+            heading="MT5 Account Created",
+            message="Your new MT5 account has been created successfully.",
+            year=datetime.now().year,
+        )
         
-        send_email_to(request.email, "Your MT5 trading account is ready", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Your MT5 trading account is ready", text, html)
         return EmailResponse(success=True, message=f"MT5 account email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending MT5 account email: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to send email")
 
 @router.post("/send-deposit", response_model=EmailResponse)
-def send_deposit_email(request: DepositEmailRequest):
+async def send_deposit_email(request: DepositEmailRequest, background_tasks: BackgroundTasks):
     try:
         recipient_name = request.name or 'Trader'
-        logo_url = get_logo_url()
-        dashboard_url = settings.CLIENT_URL
-        date_str = request.date or datetime.now().isoformat()
+        now = datetime.now()
+        date_str = request.date or now.isoformat()
         
         text = f"Hi {recipient_name},\n\nWe have received your deposit request.\n\nAccount: {request.account_login}\nAmount: {request.amount}\nDate: {date_str}\n\nOur team will process your deposit and notify you once completed.\n\nBest regards,\nZuperior\n"
         
-        html = f'<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"/></head><body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif"><table width="100%" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:16px"><tr><td style="background:linear-gradient(90deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:24px"><img src="{logo_url}" alt="Zuperior" style="height:28px" /><div style="font-size:20px;color:#fff;font-weight:700">Zuperior</div><div style="font-size:13px;color:rgba(255,255,255,0.85)">Deposit Request Created</div></td></tr><tr><td style="padding:24px"><div style="font-size:16px;font-weight:600">Hi {recipient_name},</div><p style="margin:8px 0;font-size:14px">We have received your deposit request.</p></td></tr><tr><td align="center" style="padding:0 24px 28px"><a href="{dashboard_url}" style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;text-decoration:none;font-weight:600;padding:12px 18px;border-radius:10px">Open Dashboard</a></td></tr><tr><td style="background:#fafafa;padding:14px 24px;font-size:12px;border-top:1px solid {BORDER_COLOR}">© {datetime.now().year} Zuperior. All rights reserved</td></tr></table></body></html>'
+        html = render_email(
+            _NOTICE_TPL,
+            name=recipient_name,
+            heading="Deposit Request Created",
+            message="We have received your deposit request.",
+            year=now.year,
+        )
         
-        send_email_to(request.email, "Deposit Request Created", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Deposit Request Created", text, html)
         return EmailResponse(success=True, message=f"Deposit email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending deposit email: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to send email")
 
 @router.post("/send-withdrawal", response_model=EmailResponse)
-def send_withdrawal_email(request: WithdrawalEmailRequest):
+async def send_withdrawal_email(request: WithdrawalEmailRequest, background_tasks: BackgroundTasks):
     try:
         recipient_name = request.name or 'Trader'
-        logo_url = get_logo_url()
-        dashboard_url = settings.CLIENT_URL
-        date_str = request.date or datetime.now().isoformat()
+        now = datetime.now()
+        date_str = request.date or now.isoformat()
         
         text = f"Hi {recipient_name},\n\nWe have received your withdrawal request.\n\nAccount: {request.account_login}\nAmount: {request.amount}\nDate: {date_str}\n\nOur team will process your withdrawal and notify you once completed.\n\nBest regards,\nZuperior\n"
         
-        html = f'<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"/></head><body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif"><table width="100%" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:16px"><tr><td style="background:linear-gradient(90deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:24px"><img src="{logo_url}" alt="Zuperior" style="height:28px" /><div style="font-size:20px;color:#fff;font-weight:700">Zuperior</div><div style="font-size:13px;color:rgba(255,255,255,0.85)">Withdrawal Request Created</div></td></tr><tr><td style="padding:24px"><div style="font-size:16px;font-weight:600">Hi {recipient_name},</div><p style="margin:8px 0;font-size:14px">We have received your withdrawal request.</p></td></tr><tr><td align="center" style="padding:0 24px 28px"><a href="{dashboard_url}" style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;text-decoration:none;font-weight:600;padding:12px 18px;border-radius:10px">Open Dashboard</a></td></tr><tr><td style="background:#fafafa;padding:14px 24px;font-size:12px;border-top:1px solid {BORDER_COLOR}">© {datetime.now().year} Zuperior. All rights reserved</td></tr></table></body></html>'
+        html = render_email(
+            _NOTICE_TPL,
+            name=recipient_name,
+            heading="Withdrawal Request Created",
+            message="We have received your withdrawal request.",
+            year=now.year,
+        )
         
-        send_email_to(request.email, "Withdrawal Request Created", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Withdrawal Request Created", text, html)
         return EmailResponse(success=True, message=f"Withdrawal email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending withdrawal email: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to send email")
 
 @router.post("/send-internal-transfer", response_model=EmailResponse)
-def send_internal_transfer_email(request: InternalTransferEmailRequest):
+async def send_internal_transfer_email(request: InternalTransferEmailRequest, background_tasks: BackgroundTasks):
     try:
         recipient_name = request.name or 'Trader'
-        logo_url = get_logo_url()
-        dashboard_url = settings.CLIENT_URL
-        date_str = request.date or datetime.now().isoformat()
+        now = datetime.now()
+        date_str = request.date or now.isoformat()
         
         text = f"Hi {recipient_name},\n\nYour internal transfer has been completed successfully.\n\nFrom Account: {request.from_account}\nTo Account: {request.to_account}\nAmount: {request.amount}\nDate: {date_str}\n\nYou can view your updated account balances in your dashboard.\n\nBest regards,\nZuperior\n"
         
-        html = f'<!doctype html><html><head><meta name="viewport" content="width=device-width,initial-scale=1"/></head><body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif"><table width="100%" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:16px"><tr><td style="background:linear-gradient(90deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:24px"><img src="{logo_url}" alt="Zuperior" style="height:28px" /><div style="font-size:20px;color:#fff;font-weight:700">Zuperior</div><div style="font-size:13px;color:rgba(255,255,255,0.85)">Internal Transfer Completed</div></td></tr><tr><td style="padding:24px"><div style="font-size:16px;font-weight:600">Hi {recipient_name},</div><p style="margin:8px 0;font-size:14px">Your internal transfer has been completed successfully.</p></td></tr><tr><td align="center" style="padding:0 24px 28px"><a href="{dashboard_url}" style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;text-decoration:none;font-weight:600;padding:12px 18px;border-radius:10px">Open Dashboard</a></td></tr><tr><td style="background:#fafafa;padding:14px 24px;font-size:12px;border-top:1px solid {BORDER_COLOR}">© {datetime.now().year} Zuperior. All rights reserved</td></tr></table></body></html>'
+        html = render_email(
+            _NOTICE_TPL,
+            name=recipient_name,
+            heading="Internal Transfer Completed",
+            message="Your internal transfer has been completed successfully.",
+            year=now.year,
+        )
         
-        send_email_to(request.email, "Internal Transfer Completed", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Internal Transfer Completed", text, html)
         return EmailResponse(success=True, message=f"Internal transfer email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending internal transfer email: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to send email")
 
 @router.post("/send-welcome", response_model=EmailResponse)
-def send_welcome_email(request: WelcomeEmailRequest):
+async def send_welcome_email(request: WelcomeEmailRequest, background_tasks: BackgroundTasks):
     try:
         recipient_name = request.name or 'Trader'
-        logo_url = get_logo_url()
-        dashboard_url = settings.CLIENT_URL
         
         text = f"""Hi {recipient_name},
 
@@ -269,123 +359,9 @@ Happy Trading!
 Team Zuperior
 """
         
-        html = f'''<!doctype html>
-<html>
-<head>
-    <meta name="viewport" content="width=device-width,initial-scale=1"/>
-    <style>
-        @media only screen and (max-width: 600px) {{
-            .main-table {{
-                width: 100% !important;
-            }}
-            .content-padding {{
-                padding: 16px !important;
-            }}
-        }}
-    </style>
-</head>
-<body style="margin:0;padding:24px;background:{BG_COLOR};font-family:Arial,sans-serif">
-    <table width="100%" cellpadding="0" cellspacing="0" style="max-width:640px;margin:0 auto;background:#ffffff;border-radius:16px;box-shadow:0 4px 6px rgba(0,0,0,0.1)">
-        <!-- Header -->
-        <tr>
-            <td style="background:linear-gradient(135deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});padding:32px 24px;border-radius:16px 16px 0 0">
-                <table width="100%" cellpadding="0" cellspacing="0">
-                    <tr>
-                        <td style="text-align:center">
-                            <img src="{logo_url}" alt="Zuperior" style="height:32px;margin-bottom:12px" />
-                            <div style="font-size:24px;color:#fff;font-weight:700;margin-bottom:4px">Zuperior</div>
-                            <div style="font-size:14px;color:rgba(255,255,255,0.9)">Welcome Aboard!</div>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-        
-        <!-- Celebration Icon -->
-        <tr>
-            <td style="padding:32px 24px 16px;text-align:center">
-                <div style="font-size:64px">🎉</div>
-            </td>
-        </tr>
-        
-        <!-- Greeting -->
-        <tr>
-            <td class="content-padding" style="padding:0 24px 16px">
-                <div style="font-size:20px;font-weight:600;color:#1f2937;margin-bottom:8px">Hi {recipient_name}!</div>
-                <p style="margin:0;font-size:16px;color:#4b5563;line-height:1.6">
-                    We're thrilled to have you join our trading community. Your account has been created successfully and you're all set to start your trading journey with us!
-                </p>
-            </td>
-        </tr>
-        
-        <!-- Quick Steps -->
-        <tr>
-            <td class="content-padding" style="padding:16px 24px">
-                <div style="background:#f8f9fa;border-radius:12px;padding:20px;border-left:4px solid {BRAND_PRIMARY}">
-                    <div style="font-size:16px;font-weight:600;color:#1f2937;margin-bottom:12px">Get Started in 3 Easy Steps:</div>
-                    <table width="100%" cellpadding="0" cellspacing="0">
-                        <tr>
-                            <td style="padding:8px 0;vertical-align:top">
-                                <div style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;width:24px;height:24px;border-radius:50%;text-align:center;line-height:24px;font-weight:700;font-size:14px;margin-right:12px">1</div>
-                                <span style="font-size:14px;color:#374151;line-height:1.6">Complete your KYC verification to unlock all features</span>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding:8px 0;vertical-align:top">
-                                <div style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;width:24px;height:24px;border-radius:50%;text-align:center;line-height:24px;font-weight:700;font-size:14px;margin-right:12px">2</div>
-                                <span style="font-size:14px;color:#374151;line-height:1.6">Fund your account with your preferred payment method</span>
-                            </td>
-                        </tr>
-                        <tr>
-                            <td style="padding:8px 0;vertical-align:top">
-                                <div style="display:inline-block;background:{BRAND_PRIMARY};color:#fff;width:24px;height:24px;border-radius:50%;text-align:center;line-height:24px;font-weight:700;font-size:14px;margin-right:12px">3</div>
-                                <span style="font-size:14px;color:#374151;line-height:1.6">Start trading on our powerful MT5 platform</span>
-                            </td>
-                        </tr>
-                    </table>
-                </div>
-            </td>
-        </tr>
-        
-        <!-- CTA Button -->
-        <tr>
-            <td class="content-padding" style="padding:16px 24px 32px;text-align:center">
-                <a href="{dashboard_url}" style="display:inline-block;background:linear-gradient(135deg,{BRAND_PRIMARY},{BRAND_PRIMARY_ALT});color:#fff;text-decoration:none;font-weight:600;padding:14px 32px;border-radius:10px;font-size:16px;box-shadow:0 4px 6px rgba(98,66,165,0.3);transition:all 0.3s">
-                    Go to Dashboard
-                </a>
-            </td>
-        </tr>
+        html = render_email(_WELCOME_TPL, name=recipient_name, year=datetime.now().year)
         
-        <!-- Support Section -->
-        <tr>
-            <td class="content-padding" style="padding:16px 24px 24px;border-top:1px solid {BORDER_COLOR}">
-                <div style="background:#fef3c7;border-radius:10px;padding:16px;text-align:center">
-                    <p style="margin:0;font-size:14px;color:#78350f;line-height:1.6">
-                        💬 <strong>Need help?</strong> Our support team is here for you 24/7.<br/>
-                        We're committed to making your trading experience exceptional.
-                    </p>
-                </div>
-            </td>
-        </tr>
-        
-        <!-- Footer -->
-        <tr>
-            <td style="background:#fafafa;padding:20px 24px;font-size:12px;color:#6b7280;border-top:1px solid {BORDER_COLOR};border-radius:0 0 16px 16px">
-                <table width="100%" cellpadding="0" cellspacing="0">
-                    <tr>
-                        <td style="text-align:center">
-                            <p style="margin:0 0 8px 0">© {datetime.now().year} Zuperior. All rights reserved.</p>
-                            <p style="margin:0;font-size:11px">You're receiving this email because you signed up for a Zuperior account.</p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>'''
-        
-        send_email_to(request.email, "Welcome to Zuperior! 🎉", text, html)
+        background_tasks.add_task(send_email_task, request.email, "Welcome to Zuperior! 🎉", text, html)
         return EmailResponse(success=True, message=f"Welcome email sent to {request.email}")
     except Exception as e:
         logger.error(f"Error sending welcome email: {e}")
@@ -406,29 +382,77 @@ class CustomEmailRequest(BaseModel):
     attachments: Optional[List[CustomEmailAttachment]] = None
 
 
-@router.post("/send-custom", response_model=EmailResponse)
-def send_custom_email(request: CustomEmailRequest):
+def build_custom_bodies(content_body: str, is_html: Optional[bool]) -> Tuple[str, str]:
+    """Return (text, html) bodies for caller-supplied custom email content"""
+    if is_html:
+        html = content_body
+        # Create a simple plain text version from HTML (basic conversion)
+        # Remove HTML tags for plain text version
+        text = _HTML_TAG_RE.sub('', html)
+        text = text.strip() or "Please view this email in an HTML-enabled email client."
+    else:
+        text = content_body
+        # Create a simple HTML version from plain text
+        html = f'<html><body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;"><pre style="white-space: pre-wrap;">{content_body}</pre></body></html>'
+    return text, html
+
+
+def _attachment_too_large(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=detail
+    )
+
+
+def check_attachment_count(count: int) -> None:
+    if count > MAX_UPLOAD_FILES:
+        raise _attachment_too_large(f"At most {MAX_UPLOAD_FILES} attachments are allowed")
+
+
+def add_attachment_size(filename: Optional[str], size: int, total: int) -> int:
+    """Check one attachment against the per-file and total limits; returns the new total"""
+    if size > MAX_UPLOAD_FILE_BYTES:
+        raise _attachment_too_large(f"Attachment {filename} exceeds {MAX_UPLOAD_FILE_BYTES // (1024 * 1024)} MB")
+    total += size
+    if total > MAX_UPLOAD_TOTAL_BYTES:
+        raise _attachment_too_large(f"Attachments exceed {MAX_UPLOAD_TOTAL_BYTES // (1024 * 1024)} MB in total")
+    return total
+
+
+@router.post(
+    "/send-custom",
+    response_model=EmailResponse,
+    dependencies=[
+        Depends(get_current_active_admin),
+        Depends(rate_limit("send-custom", CUSTOM_EMAIL_RATE_LIMIT_PER_IP, CUSTOM_EMAIL_RATE_WINDOW_SECONDS)),
+    ],
+)
+def send_custom_email(request: CustomEmailRequest, background_tasks: BackgroundTasks):
     """
     Send a custom email with optional attachments
     
+    Admin only. Attachments are capped in count and decoded size, as on
+    /send-custom-upload (413 when exceeded).
+    
     - **recipient_email**: Email address of the recipient
     - **subject**: Email subject line
     - **content_body**: Email body content (HTML or plain text)
     - **is_html**: Whether content_body is HTML (default: True) or plain text
     - **attachments**: Optional list of file attachments (base64 encoded)
     """
+    enforce_rate_limit(
+        f"send-custom:{request.recipient_email.lower()}",
+        CUSTOM_EMAIL_RATE_LIMIT_PER_RECIPIENT,
+        CUSTOM_EMAIL_RATE_WINDOW_SECONDS,
+    )
+    if request.attachments:
+        check_attachment_count(len(request.attachments))
+        total = 0
+        for att in request.attachments:
+            # Every 4 base64 characters decode to at most 3 bytes
+            total = add_attachment_size(att.filename, len(att.content) // 4 * 3, total)
     try:
-        # Prepare text and HTML versions
-        if request.is_html:
-            html = request.content_body
-            # Create a simple plain text version from HTML (basic conversion)
-            # Remove HTML tags for plain text version
-            text = re.sub(r'<[^>]+>', '', html)
-            text = text.strip() or "Please view this email in an HTML-enabled email client."
-        else:
-            text = request.content_body
-            # Create a simple HTML version from plain text
-            html = f'<html><body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;"><pre style="white-space: pre-wrap;">{request.content_body}</pre></body></html>'
+        text, html = build_custom_bodies(request.content_body, request.is_html)
         
         # Convert attachments to the format expected by send_email_to
         attachments = None
@@ -441,7 +465,8 @@ def send_custom_email(request: CustomEmailRequest):
                     'content_type': att.content_type
                 })
         
-        send_email_to(
+        background_tasks.add_task(
+            send_email_task,
             to=request.recipient_email,
             subject=request.subject,
             text=text,
@@ -459,3 +484,145 @@ def send_custom_email(request: CustomEmailRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=f"Failed to send email: {str(e)}"
         )
+
+
+async def read_attachments(files: List[UploadFile]) -> List[Dict[str, Any]]:
+    """
+    Read uploaded files into attachment dicts, enforcing the count, per-file
+    and total size limits. Each read is bounded, so an oversized file is
+    rejected without being loaded whole.
+    """
+    check_attachment_count(len(files))
+    attachments = []
+    total = 0
+    for upload in files:
+        content = await upload.read(MAX_UPLOAD_FILE_BYTES + 1)
+        total = add_attachment_size(upload.filename, len(content), total)
+        attachments.append({
+            'filename': upload.filename,
+            'content': content,
+            'content_type': upload.content_type or "application/octet-stream"
+        })
+    return attachments
+
+
+@router.post(
+    "/send-custom-upload",
+    response_model=EmailResponse,
+    dependencies=[
+        Depends(get_current_active_admin),
+        Depends(rate_limit("send-custom", CUSTOM_EMAIL_RATE_LIMIT_PER_IP, CUSTOM_EMAIL_RATE_WINDOW_SECONDS)),
+    ],
+)
+async def send_custom_email_upload(
+    background_tasks: BackgroundTasks,
+    recipient_email: NormalizedEmail = Form(...),
+    subject: str = Form(...),
+    content_body: str = Form(...),
+    is_html: bool = Form(True),
+    files: List[UploadFile] = File(default=[]),
+):
+    """
+    Send a custom email with attachments uploaded as multipart/form-data
+    
+    Same as /send-custom, but files are sent as raw bytes instead of base64
+    strings inside JSON, so large attachments aren't inflated by a third and
+    decoded again on the server. Admin only; attachments are capped in
+    count and size (413 when exceeded).
+    """
+    # Shares the /send-custom counters; the cache call blocks, so off the loop
+    await run_in_threadpool(
+        enforce_rate_limit,
+        f"send-custom:{recipient_email}",
+        CUSTOM_EMAIL_RATE_LIMIT_PER_RECIPIENT,
+        CUSTOM_EMAIL_RATE_WINDOW_SECONDS,
+    )
+    attachments = await read_attachments(files)
+    try:
+        text, html = build_custom_bodies(content_body, is_html)
+        
+        background_tasks.add_task(
+            send_email_task,
+            to=recipient_email,
+            subject=subject,
+            text=text,
+            html=html,
+            attachments=attachments or None
+        )
+        
+        return EmailResponse(
+            success=True,
+            message=f"Custom email sent to {recipient_email}"
+        )
+    except Exception as e:
+        logger.error(f"Error sending custom email: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to send email: {str(e)}"
+        )
+
+
+class BulkCustomEmailRequest(BaseModel):
+    recipients: List[NormalizedEmail] = Field(..., min_length=1, max_length=MAX_BULK_RECIPIENTS)
+    subject: str
+    content_body: str  # HTML or plain text content, may contain $placeholders
+    is_html: Optional[bool] = True
+    # Optional merge values per recipient: {email: {placeholder: value}}
+    per_recipient_vars: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def send_bulk_email_task(request: BulkCustomEmailRequest):
+    """
+    Background task that renders each recipient's copy and sends the batch
+    over one SMTP session
+    """
+    try:
+        # Recipients are lowercased by NormalizedEmail, so match keys the same way
+        per_recipient_vars = {email.lower(): values for email, values in (request.per_recipient_vars or {}).items()}
+        body_template = Template(request.content_body)
+        messages = []
+        for recipient in request.recipients:
+            merge_vars = per_recipient_vars.get(recipient)
+            if merge_vars and request.is_html:
+                # Merge values are data, not markup, as in render_email
+                merge_vars = {key: escape(str(value)) for key, value in merge_vars.items()}
+            content_body = body_template.safe_substitute(merge_vars) if merge_vars else request.content_body
+            text, html = build_custom_bodies(content_body, request.is_html)
+            messages.append({"to": recipient, "subject": request.subject, "text": text, "html": html})
+        send_bulk_emails(messages)
+    except Exception as e:
+        logger.error(f"Failed to send bulk email batch of {len(request.recipients)}: {e}")
+
+
+@router.post(
+    "/send-custom-bulk",
+    response_model=EmailResponse,
+    dependencies=[
+        Depends(get_current_active_admin),
+        Depends(rate_limit("send-custom-bulk", BULK_EMAIL_RATE_LIMIT_PER_IP, CUSTOM_EMAIL_RATE_WINDOW_SECONDS)),
+    ],
+)
+def send_custom_bulk_email(request: BulkCustomEmailRequest, background_tasks: BackgroundTasks):
+    """
+    Send the same custom email to many recipients over a single SMTP session
+    
+    Admin only. Rendering and sending happen after the response is returned.
+    
+    - **recipients**: Email addresses of the recipients (at most 100)
+    - **subject**: Email subject line
+    - **content_body**: Email body content (HTML or plain text)
+    - **is_html**: Whether content_body is HTML (default: True) or plain text
+    - **per_recipient_vars**: Optional values substituted into $placeholders per recipient
+    """
+    try:
+        background_tasks.add_task(send_bulk_email_task, request)
+        return EmailResponse(
+            success=True,
+            message=f"Custom email queued for {len(request.recipients)} recipient(s)"
+        )
+    except Exception as e:
+        logger.error(f"Error sending bulk custom email: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to send email: {str(e)}"
+        )
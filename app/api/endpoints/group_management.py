@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Literal
 from app.core.database import get_db
+from app.core import cache
 from app.api.deps import get_current_active_user, get_current_active_admin
 from app.schemas.schemas import (
     GroupManagementResponse,
@@ -14,6 +16,19 @@ from app.models.models import User
 
 router = APIRouter()
 
+# list_groups pages are cached briefly; every write bumps the version so
+# stale pages are simply never read again and expire on their own.
+GROUPS_LIST_CACHE_SECONDS = 30
+GROUPS_VERSION_KEY = "groups:ver"
+
+
+def invalidate_group_lists() -> None:
+    cache.get_cache().incr(GROUPS_VERSION_KEY)
+
+
+# Columns selected for list pages, so rows come back as plain dicts
+_GROUP_RESPONSE_FIELDS = tuple(GroupManagementResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_groups(
@@ -22,7 +37,7 @@ def list_groups(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("asc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("asc"),
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     account_type: Optional[str] = Query(None)
@@ -30,6 +45,13 @@ def list_groups(
     """
     List groups with pagination
     """
+    version = cache.get_cache().get(GROUPS_VERSION_KEY) or "0"
+    cache_key = f"groups:list:{version}:{page}:{per_page}:{sort_by}:{order}:{search}:{is_active}:{account_type}"
+    cached = cache.get_cache().get(cache_key)
+    if cached is not None:
+        # Already-encoded JSON, hand it straight back
+        return Response(content=cached, media_type="application/json")
+    
     filters = {}
     if is_active is not None:
         filters["is_active"] = is_active
@@ -44,13 +66,15 @@ def list_groups(
         order=order,
         filters=filters,
         search=search,
-        search_fields=["group", "dedicated_name"]
+        search_fields=["group", "dedicated_name"],
+        columns=_GROUP_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [GroupManagementResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Encode once with orjson, bypassing response_model re-validation, and
+    # cache the exact bytes we send
+    response = ORJSONResponse(result)
+    cache.get_cache().set(cache_key, response.body.decode(), ex=GROUPS_LIST_CACHE_SECONDS)
+    return response
 
 
 @router.get("/{group_id}", response_model=GroupManagementResponse)
@@ -89,6 +113,7 @@ def create_group(
         )
     
     group = group_management_crud.create(db, obj_in=group_in)
+    invalidate_group_lists()
     return group
 
 
@@ -110,6 +135,7 @@ def update_group(
         )
     
     updated_group = group_management_crud.update(db, db_obj=group, obj_in=group_update)
+    invalidate_group_lists()
     return updated_group
 
 
@@ -122,12 +148,11 @@ def delete_group(
     """
     Delete group (Admin only)
     """
-    group = group_management_crud.get_by_id(db, id=group_id)
-    if not group:
+    if not group_management_crud.delete_by_id(db, id=group_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found"
         )
     
-    group_management_crud.delete(db, id=group_id)
+    invalidate_group_lists()
     return None
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from app.core.database import get_db
+from app.core import cache
 from app.api.deps import get_current_active_user
 from app.schemas.schemas import (
     KYCResponse,
@@ -9,10 +10,38 @@ from app.schemas.schemas import (
     KYCUpdate
 )
 from app.crud.crud import kyc_crud
-from app.models.models import User
+from app.models.models import User, KYC
 
 router = APIRouter()
 
+# KYC rows change rarely, so GET /kyc/ is served from the shared cache.
+# Reviews made outside this API show up once the entry expires.
+KYC_CACHE_SECONDS = 60
+
+# Statuses that a user resubmitting their document drops back to Pending
+_VERIFIED_STATES = frozenset(("Verified", "Partially Verified"))
+
+
+def kyc_cache_key(user_id: str) -> str:
+    return f"kyc:{user_id}"
+
+
+def lock_kyc_for_user(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> KYC:
+    """
+    Load the current user's KYC row with SELECT ... FOR UPDATE, or raise 404.
+    The lock holds until the handler commits, so concurrent updates serialize.
+    """
+    kyc = db.query(KYC).filter(KYC.userId == current_user.id).with_for_update().first()
+    if not kyc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="KYC not found for this user"
+        )
+    return kyc
+
 
 @router.get("/", response_model=KYCResponse)
 def get_kyc(
@@ -22,6 +51,11 @@ def get_kyc(
     """
     Get KYC for current user
     """
+    cache_key = kyc_cache_key(current_user.id)
+    cached = cache.get_cache().get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     kyc = kyc_crud.get_by_user_id(db, user_id=current_user.id)
     
     if not kyc:
@@ -30,7 +64,9 @@ def get_kyc(
             detail="KYC not found for this user"
         )
     
-    return kyc
+    body = KYCResponse.model_validate(kyc).model_dump_json()
+    cache.get_cache().set(cache_key, body, ex=KYC_CACHE_SECONDS)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/", response_model=KYCResponse, status_code=status.HTTP_201_CREATED)
@@ -42,41 +78,32 @@ def create_kyc(
     """
     Create or submit KYC for current user
     """
-    existing_kyc = kyc_crud.get_by_user_id(db, user_id=current_user.id)
+    now = datetime.now(timezone.utc)
     
     # Build data (include None to allow overwrites)
     kyc_data = kyc_in.model_dump()
     
     # Set submission timestamps based on what's provided
     if kyc_data.get("documentReference"):
-        kyc_data["documentSubmittedAt"] = datetime.now(timezone.utc)
+        kyc_data["documentSubmittedAt"] = now
     if kyc_data.get("addressReference"):
-        kyc_data["addressSubmittedAt"] = datetime.now(timezone.utc)
+        kyc_data["addressSubmittedAt"] = now
     
     # Set initial verification status if not provided
     if not kyc_data.get("verificationStatus"):
         kyc_data["verificationStatus"] = "Pending"
     
-    if existing_kyc:
-        # Overwrite existing KYC (admin use-case)
-        updated_kyc = kyc_crud.update(
-            db,
-            db_obj=existing_kyc,
-            obj_in=KYCUpdate(**kyc_data)
-        )
-        return updated_kyc
-    
-    kyc = kyc_crud.create(
-        db,
-        obj_in=KYCCreate(**kyc_data),
-        userId=current_user.id
-    )
+    # Insert, or overwrite an existing KYC (admin use-case), in one statement
+    kyc_data["userId"] = current_user.id
+    kyc = kyc_crud.upsert(db, conflict_cols=("userId",), values=kyc_data)
+    cache.get_cache().delete(kyc_cache_key(current_user.id))
     return kyc
 
 
 @router.put("/", response_model=KYCResponse)
 def update_kyc(
     kyc_update: KYCUpdate,
+    kyc: KYC = Depends(lock_kyc_for_user),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -94,13 +121,7 @@ def update_kyc(
     - verificationStatus
     - rejectionReason
     """
-    kyc = kyc_crud.get_by_user_id(db, user_id=current_user.id)
-    
-    if not kyc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="KYC not found for this user"
-        )
+    now = datetime.now(timezone.utc)
     
     # Get update data
     kyc_data = kyc_update.model_dump(exclude_unset=True)
@@ -117,15 +138,15 @@ def update_kyc(
     
     # Update submission timestamps when references are updated
     if "documentReference" in kyc_data and kyc_data["documentReference"]:
-        kyc.documentSubmittedAt = datetime.now(timezone.utc)
+        kyc.documentSubmittedAt = now
         # Reset verification status if document is resubmitted
         if current_user.role != "admin":
             kyc.isDocumentVerified = False
-            if kyc.verificationStatus in ["Verified", "Partially Verified"]:
+            if kyc.verificationStatus in _VERIFIED_STATES:
                 kyc.verificationStatus = "Pending"
     
     if "addressReference" in kyc_data and kyc_data["addressReference"]:
-        kyc.addressSubmittedAt = datetime.now(timezone.utc)
+        kyc.addressSubmittedAt = now
         # Reset verification status if address is resubmitted
         if current_user.role != "admin":
             kyc.isAddressVerified = False
@@ -151,24 +172,19 @@ def update_kyc(
     
     # Update KYC
     updated_kyc = kyc_crud.update(db, db_obj=kyc, obj_in=kyc_update)
+    cache.get_cache().delete(kyc_cache_key(current_user.id))
     return updated_kyc
 
 
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 def delete_kyc(
+    kyc: KYC = Depends(lock_kyc_for_user),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete KYC for current user
     """
-    kyc = kyc_crud.get_by_user_id(db, user_id=current_user.id)
-    
-    if not kyc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="KYC not found for this user"
-        )
-    
-    kyc_crud.delete(db, id=kyc.id)
+    kyc_crud.remove(db, db_obj=kyc)
+    cache.get_cache().delete(kyc_cache_key(current_user.id))
     return None
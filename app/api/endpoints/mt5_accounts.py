@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, owned_resource
 from app.schemas.schemas import (
     MT5AccountResponse,
     MT5AccountCreate,
@@ -10,10 +11,17 @@ from app.schemas.schemas import (
     PaginatedResponse
 )
 from app.crud.crud import mt5_account_crud, group_management_crud
-from app.models.models import User
+from app.models.models import User, MT5Account
 
 router = APIRouter()
 
+# Load an MT5 account by path id, owned by the current user or any for admins
+get_owned_mt5_account = owned_resource(MT5Account, "account_id", name="MT5 account")
+lock_owned_mt5_account = owned_resource(MT5Account, "account_id", name="MT5 account", lock=True)
+
+# Columns selected for list pages, so rows come back as plain dicts
+_MT5_ACCOUNT_RESPONSE_FIELDS = tuple(MT5AccountResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_mt5_accounts(
@@ -22,7 +30,7 @@ def list_mt5_accounts(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     search: Optional[str] = Query(None),
     group: Optional[str] = Query(None)
 ):
@@ -49,39 +57,21 @@ def list_mt5_accounts(
         filters=filters,
         search=search,
         search_fields=["accountId", "nameOnAccount"],
-        user_id=user_id
+        user_id=user_id,
+        columns=_MT5_ACCOUNT_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [MT5AccountResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{account_id}", response_model=MT5AccountResponse)
-def get_mt5_account(
-    account_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def get_mt5_account(
+    account: MT5Account = Depends(get_owned_mt5_account)
 ):
     """
     Get MT5 account by ID
     """
-    account = mt5_account_crud.get_by_id(db, id=account_id)
-    
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 account not found"
-        )
-    
-    # Allow access if user is admin OR if the account belongs to the user
-    if current_user.role != "admin" and account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this MT5 account"
-        )
-    
     return account
 
 
@@ -94,14 +84,6 @@ def create_mt5_account(
     """
     Create new MT5 account
     """
-    # Check if accountId already exists
-    existing = mt5_account_crud.get_by_account_id(db, account_id=account_in.accountId)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="MT5 account ID already exists"
-        )
-        
     # Validate package (group) if provided
     if account_in.package:
         group = group_management_crud.get_by_group(db, group=account_in.package)
@@ -114,35 +96,25 @@ def create_mt5_account(
     # If admin creates account, they can specify userId, otherwise use current_user.id
     # For now, we assume admin is creating for themselves or we might need to add userId to MT5AccountCreate schema
     # But based on current schema, we'll just use current_user.id
-    account = mt5_account_crud.create(db, obj_in=account_in, userId=current_user.id)
+    # accountId uniqueness is enforced by the insert itself (ON CONFLICT DO NOTHING)
+    account = mt5_account_crud.create_if_absent(db, obj_in=account_in, userId=current_user.id)
+    if account is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="MT5 account ID already exists"
+        )
     return account
 
 
 @router.put("/{account_id}", response_model=MT5AccountResponse)
 def update_mt5_account(
-    account_id: str,
     account_update: MT5AccountUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    account: MT5Account = Depends(lock_owned_mt5_account),
+    db: Session = Depends(get_db)
 ):
     """
     Update MT5 account
     """
-    account = mt5_account_crud.get_by_id(db, id=account_id)
-    
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 account not found"
-        )
-    
-    # Allow update if user is admin OR if the account belongs to the user
-    if current_user.role != "admin" and account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this MT5 account"
-        )
-        
     # Validate package (group) if provided
     if account_update.package:
         group = group_management_crud.get_by_group(db, group=account_update.package)
@@ -158,29 +130,13 @@ def update_mt5_account(
 
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_mt5_account(
-    account_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    account: MT5Account = Depends(lock_owned_mt5_account),
+    db: Session = Depends(get_db)
 ):
     """
     Delete MT5 account
     """
-    account = mt5_account_crud.get_by_id(db, id=account_id)
-    
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 account not found"
-        )
-    
-    # Allow delete if user is admin OR if the account belongs to the user
-    if current_user.role != "admin" and account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this MT5 account"
-        )
-    
-    mt5_account_crud.delete(db, id=account_id)
+    mt5_account_crud.remove(db, db_obj=account)
     return None
 
 
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload
+from typing import Optional, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, invalid_cursor, owned_resource
 from app.schemas.schemas import (
     MT5TransactionResponse,
     MT5TransactionCreate,
@@ -10,10 +11,23 @@ from app.schemas.schemas import (
     PaginatedResponse
 )
 from app.crud.crud import mt5_transaction_crud, mt5_account_crud
-from app.models.models import User
+from app.models.models import User, MT5Account, MT5Transaction
 
 router = APIRouter()
 
+# Load a transaction by path id, only if it is on one of the user's MT5 accounts
+_owned_transaction_kwargs = dict(
+    name="MT5 transaction",
+    owner_id=lambda transaction: transaction.mt5Account.userId if transaction.mt5Account else None,
+    allow_admin=False,
+    options=(joinedload(MT5Transaction.mt5Account),),
+)
+get_owned_transaction = owned_resource(MT5Transaction, "transaction_id", **_owned_transaction_kwargs)
+lock_owned_transaction = owned_resource(MT5Transaction, "transaction_id", lock=True, **_owned_transaction_kwargs)
+
+# Columns selected for list pages, so rows come back as plain dicts
+_MT5_TRANSACTION_RESPONSE_FIELDS = tuple(MT5TransactionResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_mt5_transactions(
@@ -22,118 +36,51 @@ def list_mt5_transactions(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
     currency: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(True, description="Count all matching rows; ignored with a cursor")
 ):
     """
-    List MT5 transactions for current user's MT5 accounts with pagination and filtering
+    List MT5 transactions for current user's MT5 accounts with pagination and filtering.
+    Pass the returned next_cursor back as cursor to page without OFFSET.
     """
-    # Get user's MT5 account IDs
-    user_mt5_accounts = mt5_account_crud.get_multi(
-        db,
-        user_id=current_user.id,
-        page=1,
-        per_page=1000  # Get all user's accounts
-    )
-    
-    mt5_account_ids = [acc.id for acc in user_mt5_accounts["items"]]
-    
-    # Build filters
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if type:
-        filters["type"] = type
-    if currency:
-        filters["currency"] = currency
-    
-    # Query transactions
-    query = db.query(mt5_transaction_crud.model)
-    
-    # Filter by user's MT5 accounts
-    if mt5_account_ids:
-        query = query.filter(mt5_transaction_crud.model.mt5AccountId.in_(mt5_account_ids))
-    else:
-        # User has no MT5 accounts
-        return {
-            "items": [],
-            "total": 0,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": 0
-        }
-    
-    # Apply filters
-    for field, value in filters.items():
-        if hasattr(mt5_transaction_crud.model, field):
-            query = query.filter(getattr(mt5_transaction_crud.model, field) == value)
-    
-    # Apply search
-    if search:
-        query = query.filter(
-            mt5_transaction_crud.model.comment.ilike(f"%{search}%") |
-            mt5_transaction_crud.model.transactionId.ilike(f"%{search}%")
+    filters = {k: v for k, v in (("status", status), ("type", type), ("currency", currency)) if v}
+    
+    try:
+        # Transactions on the current user's MT5 accounts, in one statement
+        result = mt5_transaction_crud.get_multi(
+            db,
+            page=page,
+            per_page=per_page,
+            sort_by=sort_by,
+            order=order,
+            filters=filters,
+            search=search,
+            search_fields=["comment", "transactionId"],
+            columns=_MT5_TRANSACTION_RESPONSE_FIELDS,
+            cursor=cursor,
+            include_total=include_total,
+            join=(MT5Account, MT5Account.id == MT5Transaction.mt5AccountId),
+            where=(MT5Account.userId == current_user.id,)
         )
+    except ValueError as exc:
+        raise invalid_cursor(exc)
     
-    # Get total
-    total = query.count()
-    
-    # Apply sorting
-    if sort_by and hasattr(mt5_transaction_crud.model, sort_by):
-        if order == "asc":
-            query = query.order_by(getattr(mt5_transaction_crud.model, sort_by).asc())
-        else:
-            query = query.order_by(getattr(mt5_transaction_crud.model, sort_by).desc())
-    else:
-        query = query.order_by(mt5_transaction_crud.model.createdAt.desc())
-    
-    # Paginate
-    offset = (page - 1) * per_page
-    items = query.offset(offset).limit(per_page).all()
-    
-    import math
-    total_pages = math.ceil(total / per_page) if per_page > 0 else 0
-    
-    # Convert SQLAlchemy objects to Pydantic models
-    items_response = [MT5TransactionResponse.model_validate(item) for item in items]
-    
-    return {
-        "items": items_response,
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages
-    }
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{transaction_id}", response_model=MT5TransactionResponse)
-def get_mt5_transaction(
-    transaction_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def get_mt5_transaction(
+    transaction: MT5Transaction = Depends(get_owned_transaction)
 ):
     """
     Get MT5 transaction by ID
     """
-    transaction = mt5_transaction_crud.get_by_id(db, id=transaction_id)
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 transaction not found"
-        )
-    
-    # Check if transaction belongs to user's MT5 account
-    mt5_account = mt5_account_crud.get_by_id(db, id=transaction.mt5AccountId)
-    if not mt5_account or mt5_account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this transaction"
-        )
-    
     return transaction
 
 
@@ -170,30 +117,13 @@ def create_mt5_transaction(
 
 @router.put("/{transaction_id}", response_model=MT5TransactionResponse)
 def update_mt5_transaction(
-    transaction_id: str,
     transaction_update: MT5TransactionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    transaction: MT5Transaction = Depends(lock_owned_transaction),
+    db: Session = Depends(get_db)
 ):
     """
     Update MT5 transaction
     """
-    transaction = mt5_transaction_crud.get_by_id(db, id=transaction_id)
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 transaction not found"
-        )
-    
-    # Check if transaction belongs to user's MT5 account
-    mt5_account = mt5_account_crud.get_by_id(db, id=transaction.mt5AccountId)
-    if not mt5_account or mt5_account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this transaction"
-        )
-    
     updated_transaction = mt5_transaction_crud.update(
         db,
         db_obj=transaction,
@@ -204,29 +134,12 @@ def update_mt5_transaction(
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_mt5_transaction(
-    transaction_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    transaction: MT5Transaction = Depends(lock_owned_transaction),
+    db: Session = Depends(get_db)
 ):
     """
     Delete MT5 transaction
     """
-    transaction = mt5_transaction_crud.get_by_id(db, id=transaction_id)
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="MT5 transaction not found"
-        )
-    
-    # Check if transaction belongs to user's MT5 account
-    mt5_account = mt5_account_crud.get_by_id(db, id=transaction.mt5AccountId)
-    if not mt5_account or mt5_account.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this transaction"
-        )
-    
-    mt5_transaction_crud.delete(db, id=transaction_id)
+    mt5_transaction_crud.remove(db, db_obj=transaction)
     return None
 
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from sqlalchemy import func
+from typing import Optional, Dict, Any, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.core import cache
+from app.api.deps import get_current_active_user, invalid_cursor
 from app.schemas.schemas import (
     NotificationResponse,
     NotificationCreate,
@@ -10,11 +13,46 @@ from app.schemas.schemas import (
     PaginatedResponse,
     MessageResponse
 )
+from app.schemas.fast_convert import RowSerializer
 from app.crud.crud import notification_crud
-from app.models.models import User
+from app.models.models import User, Notification
 
 router = APIRouter()
 
+# Clients poll the unread count, so it is cached briefly and dropped on
+# every change this API makes to the user's notifications
+UNREAD_COUNT_CACHE_SECONDS = 30
+
+
+def unread_count_cache_key(user_id: str) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def invalidate_unread_count(user_id: str) -> None:
+    cache.get_cache().delete(unread_count_cache_key(user_id))
+
+
+# Rows are trusted, so responses skip validation (metadata lives in metadata_json,
+# which response_model validation of an ORM object would not find)
+_notification_rows = RowSerializer(NotificationResponse, metadata="metadata_json")
+
+
+def get_owned_notification(
+    notification_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Notification:
+    """
+    Load a notification owned by the current user, or 404
+    """
+    notification = notification_crud.get_for_user(db, id=notification_id, user_id=current_user.id)
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    return notification
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_notifications(
@@ -23,13 +61,16 @@ def list_notifications(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     is_read: Optional[bool] = Query(None),
     type: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(True, description="Count all matching rows; pass false and use has_more to skip the count")
 ):
     """
     List notifications for current user with pagination and filtering
+    Pass the returned next_cursor back as cursor to page without OFFSET.
     """
     filters: Dict[str, Any] = {}
     if is_read is not None:
@@ -37,22 +78,27 @@ def list_notifications(
     if type:
         filters["type"] = type
     
-    result = notification_crud.get_multi(
-        db,
-        page=page,
-        per_page=per_page,
-        sort_by=sort_by,
-        order=order,
-        filters=filters,
-        search=search,
-        search_fields=["title", "message"],
-        user_id=current_user.id
-    )
-    
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [NotificationResponse.model_validate(item) for item in result['items']]
+    try:
+        result = notification_crud.get_multi(
+            db,
+            page=page,
+            per_page=per_page,
+            sort_by=sort_by,
+            order=order,
+            filters=filters,
+            search=search,
+            search_fields=["title", "message"],
+            user_id=current_user.id,
+            cursor=cursor,
+            include_total=include_total,
+            columns=_notification_rows.columns
+        )
+    except ValueError as exc:
+        raise invalid_cursor(exc)
     
-    return result
+    # Only the response columns are selected (no ORM objects); encode once
+    # with orjson, bypassing response_model re-validation
+    return ORJSONResponse(_notification_rows.dump_page(result))
 
 
 @router.get("/unread-count", response_model=Dict[str, int])
@@ -63,15 +109,19 @@ def get_unread_count(
     """
     Get count of unread notifications for current user
     """
-    from sqlalchemy import func
-    from app.models.models import Notification
+    cache_key = unread_count_cache_key(current_user.id)
+    cached = cache.get_cache().get(cache_key)
+    if cached is not None:
+        return {"unread_count": int(cached)}
     
-    count = db.query(func.count(Notification.id)).filter(
+    # Filters match idx_notification_user_read, so this can count from the index
+    count = db.query(func.count()).select_from(Notification).filter(
         Notification.userId == current_user.id,
         Notification.isRead == False
-    ).scalar()
+    ).scalar() or 0
     
-    return {"unread_count": count or 0}
+    cache.get_cache().set(cache_key, count, ex=UNREAD_COUNT_CACHE_SECONDS)
+    return {"unread_count": count}
 
 
 @router.put("/mark-all-read", response_model=MessageResponse)
@@ -83,33 +133,18 @@ def mark_all_notifications_read(
     Mark all notifications as read for current user
     """
     count = notification_crud.mark_all_as_read(db, user_id=current_user.id)
+    invalidate_unread_count(current_user.id)
     return {"message": f"Marked {count} notifications as read"}
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
 def get_notification(
-    notification_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    notification: Notification = Depends(get_owned_notification)
 ):
     """
     Get notification by ID
     """
-    notification = notification_crud.get_by_id(db, id=notification_id)
-    
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
-    
-    if notification.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this notification"
-        )
-    
-    return notification
+    return ORJSONResponse(_notification_rows.dump(notification))
 
 
 @router.post("/", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
@@ -122,87 +157,47 @@ def create_notification(
     Create new notification (typically used by system/admin)
     """
     notification = notification_crud.create(db, obj_in=notification_in, userId=current_user.id)
-    return notification
+    invalidate_unread_count(current_user.id)
+    return ORJSONResponse(_notification_rows.dump(notification), status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/{notification_id}", response_model=NotificationResponse)
 def update_notification(
-    notification_id: str,
     notification_update: NotificationUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    notification: Notification = Depends(get_owned_notification),
+    db: Session = Depends(get_db)
 ):
     """
     Update notification (typically to mark as read)
     """
-    notification = notification_crud.get_by_id(db, id=notification_id)
-    
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
-    
-    if notification.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this notification"
-        )
-    
     updated_notification = notification_crud.update(db, db_obj=notification, obj_in=notification_update)
-    return updated_notification
+    invalidate_unread_count(notification.userId)
+    return ORJSONResponse(_notification_rows.dump(updated_notification))
 
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
 def mark_notification_read(
-    notification_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    notification: Notification = Depends(get_owned_notification),
+    db: Session = Depends(get_db)
 ):
     """
     Mark notification as read
     """
-    notification = notification_crud.get_by_id(db, id=notification_id)
-    
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
-    
-    if notification.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this notification"
-        )
-    
-    updated_notification = notification_crud.mark_as_read(db, notification_id=notification_id)
-    return updated_notification
+    updated_notification = notification_crud.mark_as_read(db, notification=notification)
+    invalidate_unread_count(notification.userId)
+    return ORJSONResponse(_notification_rows.dump(updated_notification))
 
 
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_notification(
-    notification_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    notification: Notification = Depends(get_owned_notification),
+    db: Session = Depends(get_db)
 ):
     """
     Delete notification
     """
-    notification = notification_crud.get_by_id(db, id=notification_id)
-    
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
-    
-    if notification.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this notification"
-        )
-    
-    notification_crud.delete(db, id=notification_id)
+    user_id = notification.userId
+    notification_crud.remove(db, db_obj=notification)
+    invalidate_unread_count(user_id)
     return None
 
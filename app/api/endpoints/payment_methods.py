@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Literal
 from app.core.database import get_db
 from app.api.deps import get_current_active_user
 from app.schemas.schemas import (
@@ -10,11 +10,35 @@ from app.schemas.schemas import (
     PaymentMethodUpdate,
     PaginatedResponse
 )
+from app.schemas.fast_convert import RowSerializer
 from app.crud.crud import payment_method_crud
-from app.models.models import User
+from app.models.models import User, PaymentMethod
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_PAYMENT_METHOD_RESPONSE_FIELDS = tuple(PaymentMethodResponse.model_fields)
+
+# Rows are trusted, so single-object reads skip validation
+_payment_method_rows = RowSerializer(PaymentMethodResponse)
+
+
+def get_owned_payment_method(
+    payment_method_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> PaymentMethod:
+    """
+    Load a payment method owned by the current user, or 404
+    """
+    payment_method = payment_method_crud.get_for_user(db, id=payment_method_id, user_id=current_user.id)
+    if not payment_method:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payment method not found"
+        )
+    return payment_method
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_payment_methods(
@@ -23,7 +47,7 @@ def list_payment_methods(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     currency: Optional[str] = Query(None),
     network: Optional[str] = Query(None),
@@ -32,13 +56,7 @@ def list_payment_methods(
     """
     List payment methods for current user with pagination and filtering
     """
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if currency:
-        filters["currency"] = currency
-    if network:
-        filters["network"] = network
+    filters = {k: v for k, v in (("status", status), ("currency", currency), ("network", network)) if v}
     
     result = payment_method_crud.get_multi(
         db,
@@ -49,39 +67,22 @@ def list_payment_methods(
         filters=filters,
         search=search,
         search_fields=["address"],
-        user_id=current_user.id
+        user_id=current_user.id,
+        columns=_PAYMENT_METHOD_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [PaymentMethodResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{payment_method_id}", response_model=PaymentMethodResponse)
 def get_payment_method(
-    payment_method_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    payment_method: PaymentMethod = Depends(get_owned_payment_method)
 ):
     """
     Get payment method by ID
     """
-    payment_method = payment_method_crud.get_by_id(db, id=payment_method_id)
-    
-    if not payment_method:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment method not found"
-        )
-    
-    if payment_method.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this payment method"
-        )
-    
-    return payment_method
+    return ORJSONResponse(_payment_method_rows.dump(payment_method))
 
 
 @router.post("/", response_model=PaymentMethodResponse, status_code=status.HTTP_201_CREATED)
@@ -96,36 +97,20 @@ def create_payment_method(
     payment_method = payment_method_crud.create(
         db,
         obj_in=payment_method_in,
-        userId=current_user.id,
-        submittedAt=datetime.utcnow()
+        userId=current_user.id
     )
     return payment_method
 
 
 @router.put("/{payment_method_id}", response_model=PaymentMethodResponse)
 def update_payment_method(
-    payment_method_id: str,
     payment_method_update: PaymentMethodUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    payment_method: PaymentMethod = Depends(get_owned_payment_method),
+    db: Session = Depends(get_db)
 ):
     """
     Update payment method
     """
-    payment_method = payment_method_crud.get_by_id(db, id=payment_method_id)
-    
-    if not payment_method:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment method not found"
-        )
-    
-    if payment_method.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this payment method"
-        )
-    
     updated_payment_method = payment_method_crud.update(
         db,
         db_obj=payment_method,
@@ -136,27 +121,12 @@ def update_payment_method(
 
 @router.delete("/{payment_method_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_payment_method(
-    payment_method_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    payment_method: PaymentMethod = Depends(get_owned_payment_method),
+    db: Session = Depends(get_db)
 ):
     """
     Delete payment method
     """
-    payment_method = payment_method_crud.get_by_id(db, id=payment_method_id)
-    
-    if not payment_method:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment method not found"
-        )
-    
-    if payment_method.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this payment method"
-        )
-    
-    payment_method_crud.delete(db, id=payment_method_id)
+    payment_method_crud.remove(db, db_obj=payment_method)
     return None
 
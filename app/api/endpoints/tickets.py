@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any, List
+from typing import Optional, List, Literal
 from app.core.database import get_db
 from app.api.deps import get_current_active_user, require_role
 from app.schemas.schemas import (
@@ -13,11 +14,43 @@ from app.schemas.schemas import (
     PaginatedResponse,
     MessageResponse
 )
+from app.schemas.fast_convert import RowSerializer
 from app.crud.crud import ticket_crud, ticket_reply_crud
-from app.models.models import User
+from app.models.models import User, Ticket
 
 router = APIRouter()
 
+# Rows are trusted, so reads skip validation; userId comes from the
+# hybrid properties and NULL tags/attachments are returned as []
+_ticket_rows = RowSerializer(TicketResponse)
+_ticket_reply_rows = RowSerializer(TicketReplyResponse)
+
+
+# Ticket fields a non-admin may change (status and assignee are admin-only)
+_USER_TICKET_FIELDS = frozenset(TicketUpdate.model_fields) - {"status", "assignedTo"}
+
+
+def get_visible_ticket(
+    ticket_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Ticket:
+    """
+    Load a ticket the current user may access: any ticket for admins, only
+    their own otherwise. Ownership is part of the query, so a ticket that
+    isn't theirs is reported as not found.
+    """
+    if current_user.role == "admin":
+        ticket = ticket_crud.get_by_id(db, id=ticket_id)
+    else:
+        ticket = ticket_crud.get_for_user(db, id=ticket_id, user_id=current_user.id)
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+    return ticket
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_tickets(
@@ -26,7 +59,7 @@ def list_tickets(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     ticket_type: Optional[str] = Query(None),
@@ -36,13 +69,7 @@ def list_tickets(
     List tickets for current user with pagination and filtering
     Admins can see all tickets, users can only see their own
     """
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if priority:
-        filters["priority"] = priority
-    if ticket_type:
-        filters["ticketType"] = ticket_type
+    filters = {k: v for k, v in (("status", status), ("priority", priority), ("ticketType", ticket_type)) if v}
     
     # Admins can see all tickets, users only their own
     user_id = None if current_user.role == "admin" else current_user.id
@@ -56,73 +83,42 @@ def list_tickets(
         filters=filters,
         search=search,
         search_fields=["title", "description", "ticketNo"],
-        user_id=user_id
+        user_id=user_id,
+        columns=_ticket_rows.columns
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [TicketResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Only the response columns are selected (no ORM objects); encode once
+    # with orjson, bypassing response_model re-validation
+    return ORJSONResponse(_ticket_rows.dump_page(result))
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
 def get_ticket(
-    ticket_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    ticket: Ticket = Depends(get_visible_ticket)
 ):
     """
     Get ticket by ID
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    # Users can only access their own tickets, admins can access all
-    if current_user.role != "admin" and ticket.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this ticket"
-        )
-    
-    return ticket
+    return ORJSONResponse(_ticket_rows.dump(ticket))
 
 
 @router.get("/{ticket_id}/replies", response_model=List[TicketReplyResponse])
 def get_ticket_replies(
-    ticket_id: int,
+    ticket: Ticket = Depends(get_visible_ticket),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all replies for a ticket
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    # Users can only access their own tickets, admins can access all
-    if current_user.role != "admin" and ticket.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this ticket"
-        )
-    
-    replies = ticket_reply_crud.get_by_ticket_id(db, ticket_id=ticket_id)
-    
-    # Filter out internal replies for non-admin users
-    if current_user.role != "admin":
-        replies = [reply for reply in replies if not reply.isInternal]
+    # Internal replies are only visible to admins
+    replies = ticket_reply_crud.get_by_ticket_id(
+        db,
+        ticket_id=ticket.id,
+        include_internal=current_user.role == "admin"
+    )
     
-    return [TicketReplyResponse.model_validate(reply) for reply in replies]
+    return ORJSONResponse(_ticket_reply_rows.dump_many(replies))
 
 
 @router.post("/", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
@@ -144,29 +140,14 @@ def create_ticket(
 
 @router.post("/{ticket_id}/replies", response_model=TicketReplyResponse, status_code=status.HTTP_201_CREATED)
 def create_ticket_reply(
-    ticket_id: int,
     reply_in: TicketReplyCreate,
+    ticket: Ticket = Depends(get_visible_ticket),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create reply to a ticket
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    # Users can only reply to their own tickets, admins can reply to any
-    if current_user.role != "admin" and ticket.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to reply to this ticket"
-        )
-    
     # Set sender name if not provided
     sender_name = reply_in.senderName if reply_in.senderName else (current_user.name or current_user.email)
     
@@ -176,7 +157,7 @@ def create_ticket_reply(
     reply = ticket_reply_crud.create(
         db,
         obj_in=reply_in,
-        ticketId=ticket_id,
+        ticketId=ticket.id,
         userId=current_user.id,
         senderName=sender_name,
         senderType=sender_type
@@ -187,8 +168,8 @@ def create_ticket_reply(
 
 @router.put("/{ticket_id}", response_model=TicketResponse)
 def update_ticket(
-    ticket_id: int,
     ticket_update: TicketUpdate,
+    ticket: Ticket = Depends(get_visible_ticket),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -196,36 +177,18 @@ def update_ticket(
     Update ticket
     Users can only update their own tickets, admins can update any ticket
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    # Users can only update their own tickets, admins can update any
-    if current_user.role != "admin" and ticket.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this ticket"
-        )
-    
     # Non-admin users can only update certain fields
     if current_user.role != "admin":
-        update_data = ticket_update.model_dump(exclude_unset=True) if hasattr(ticket_update, 'model_dump') else ticket_update.dict(exclude_unset=True)
-        # Remove admin-only fields
-        update_data.pop('status', None)
-        update_data.pop('assignedTo', None)
-        ticket_update = TicketUpdate(**update_data)
-    
-    updated_ticket = ticket_crud.update(db, db_obj=ticket, obj_in=ticket_update)
+        update_data = ticket_update.model_dump(exclude_unset=True, include=_USER_TICKET_FIELDS)
+        updated_ticket = ticket_crud.update(db, db_obj=ticket, obj_in=update_data)
+    else:
+        updated_ticket = ticket_crud.update(db, db_obj=ticket, obj_in=ticket_update)
     return updated_ticket
 
 
 @router.put("/{ticket_id}/close", response_model=TicketResponse)
 def close_ticket(
-    ticket_id: int,
+    ticket: Ticket = Depends(get_visible_ticket),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -233,24 +196,9 @@ def close_ticket(
     Close a ticket
     Users can close their own tickets, admins can close any ticket
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    # Users can only close their own tickets, admins can close any
-    if current_user.role != "admin" and ticket.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to close this ticket"
-        )
-    
     closed_ticket = ticket_crud.close_ticket(
         db,
-        ticket_id=ticket_id,
+        ticket_id=ticket.id,
         closed_by=current_user.id
     )
     
@@ -269,15 +217,8 @@ def update_ticket_reply(
     Update ticket reply
     Users can only update their own replies, admins can update any reply
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    reply = ticket_reply_crud.get_by_id(db, id=reply_id)
+    # One query: the reply must exist and belong to this ticket
+    reply = ticket_reply_crud.get_for_ticket(db, reply_id=reply_id, ticket_id=ticket_id)
     
     if not reply:
         raise HTTPException(
@@ -285,12 +226,6 @@ def update_ticket_reply(
             detail="Reply not found"
         )
     
-    if reply.ticketId != ticket_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Reply does not belong to this ticket"
-        )
-    
     # Users can only update their own replies, admins can update any
     if current_user.role != "admin" and reply.userId != current_user.id:
         raise HTTPException(
@@ -340,15 +275,8 @@ def delete_ticket_reply(
     Delete ticket reply
     Users can only delete their own replies, admins can delete any reply
     """
-    ticket = ticket_crud.get_by_id(db, id=ticket_id)
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found"
-        )
-    
-    reply = ticket_reply_crud.get_by_id(db, id=reply_id)
+    # One query: the reply must exist and belong to this ticket
+    reply = ticket_reply_crud.get_for_ticket(db, reply_id=reply_id, ticket_id=ticket_id)
     
     if not reply:
         raise HTTPException(
@@ -356,12 +284,6 @@ def delete_ticket_reply(
             detail="Reply not found"
         )
     
-    if reply.ticketId != ticket_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Reply does not belong to this ticket"
-        )
-    
     # Users can only delete their own replies, admins can delete any
     if current_user.role != "admin" and reply.userId != current_user.id:
         raise HTTPException(
@@ -369,6 +291,6 @@ def delete_ticket_reply(
             detail="Not authorized to delete this reply"
         )
     
-    ticket_reply_crud.delete(db, id=reply_id)
+    ticket_reply_crud.remove(db, db_obj=reply)
     return None
 
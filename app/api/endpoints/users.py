@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.database import get_db
@@ -11,14 +12,19 @@ from app.models.models import User
 router = APIRouter()
 
 
+def user_response(user: User) -> ORJSONResponse:
+    """Serialize a user once with orjson instead of via response_model"""
+    return ORJSONResponse(UserResponse.model_validate(user).model_dump())
+
+
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(
+async def get_current_user_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get current user profile
     """
-    return current_user
+    return user_response(current_user)
 
 
 @router.put("/me", response_model=UserResponse)
@@ -49,7 +55,7 @@ def update_current_user_profile(
         user_update = UserUpdate(**update_dict)
     
     updated_user = user_crud.update(db, db_obj=current_user, obj_in=user_update)
-    return updated_user
+    return user_response(updated_user)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -74,5 +80,5 @@ def get_user_by_id(
             detail="User not found"
         )
     
-    return user
+    return user_response(user)
 
@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, invalid_cursor, missing_or_forbidden
 from app.schemas.schemas import (
     WalletTransactionResponse,
     WalletTransactionCreate,
     WalletTransactionUpdate,
     PaginatedResponse
 )
-from app.crud.crud import wallet_transaction_crud
-from app.models.models import User, Wallet
+from app.crud.crud import wallet_crud, wallet_transaction_crud
+from app.models.models import User
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_WALLET_TRANSACTION_RESPONSE_FIELDS = tuple(WalletTransactionResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_wallet_transactions(
@@ -22,39 +26,40 @@ def list_wallet_transactions(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
     wallet_id: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Count all matching rows; use has_more to page without it")
 ):
     """
     List wallet transactions for current user with pagination and filtering
+    Pass the returned next_cursor back as cursor to page without OFFSET.
     """
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if type:
-        filters["type"] = type
-    if wallet_id:
-        filters["walletId"] = wallet_id
-    
-    result = wallet_transaction_crud.get_multi(
-        db,
-        page=page,
-        per_page=per_page,
-        sort_by=sort_by,
-        order=order,
-        filters=filters,
-        search=search,
-        search_fields=["description"],
-        user_id=current_user.id
-    )
+    filters = {k: v for k, v in (("status", status), ("type", type), ("walletId", wallet_id)) if v}
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [WalletTransactionResponse.model_validate(item) for item in result['items']]
+    try:
+        result = wallet_transaction_crud.get_multi(
+            db,
+            page=page,
+            per_page=per_page,
+            sort_by=sort_by,
+            order=order,
+            filters=filters,
+            search=search,
+            search_fields=["description"],
+            user_id=current_user.id,
+            columns=_WALLET_TRANSACTION_RESPONSE_FIELDS,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as exc:
+        raise invalid_cursor(exc)
     
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{transaction_id}", response_model=WalletTransactionResponse)
@@ -66,20 +71,12 @@ def get_wallet_transaction(
     """
     Get wallet transaction by ID
     """
-    transaction = wallet_transaction_crud.get_by_id(db, id=transaction_id)
-    
+    # One query on the hit path; only a miss pays for the 403/404 lookup
+    transaction = wallet_transaction_crud.get_for_user(db, id=transaction_id, user_id=current_user.id)
     if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet transaction not found"
+        raise missing_or_forbidden(
+            wallet_transaction_crud, db, transaction_id, name="Wallet transaction", action="access"
         )
-    
-    if transaction.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this wallet transaction"
-        )
-    
     return transaction
 
 
@@ -92,25 +89,13 @@ def create_wallet_transaction(
     """
     Create new wallet transaction
     """
-    # Verify wallet belongs to user
-    wallet = db.query(Wallet).filter(Wallet.id == transaction_in.walletId).first()
-    if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    if wallet.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to create transaction for this wallet"
+    # The wallet ownership check is part of the INSERT; a miss is resolved
+    # to 403 or 404 afterwards
+    transaction = wallet_transaction_crud.create_owned(db, obj_in=transaction_in, user_id=current_user.id)
+    if not transaction:
+        raise missing_or_forbidden(
+            wallet_crud, db, transaction_in.walletId, name="Wallet", action="create transaction for"
         )
-    
-    transaction = wallet_transaction_crud.create(
-        db, 
-        obj_in=transaction_in, 
-        userId=current_user.id
-    )
     return transaction
 
 
@@ -124,25 +109,17 @@ def update_wallet_transaction(
     """
     Update wallet transaction
     """
-    transaction = wallet_transaction_crud.get_by_id(db, id=transaction_id)
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet transaction not found"
-        )
-    
-    if transaction.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this wallet transaction"
-        )
-    
-    updated_transaction = wallet_transaction_crud.update(
-        db, 
-        db_obj=transaction, 
-        obj_in=transaction_update
+    # Ownership is part of the UPDATE; a miss is resolved to 403 or 404 after
+    updated_transaction = wallet_transaction_crud.update_returning(
+        db,
+        id=transaction_id,
+        values=transaction_update.model_dump(exclude_unset=True),
+        user_id=current_user.id
     )
+    if not updated_transaction:
+        raise missing_or_forbidden(
+            wallet_transaction_crud, db, transaction_id, name="Wallet transaction", action="update"
+        )
     return updated_transaction
 
 
@@ -155,20 +132,9 @@ def delete_wallet_transaction(
     """
     Delete wallet transaction
     """
-    transaction = wallet_transaction_crud.get_by_id(db, id=transaction_id)
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet transaction not found"
+    if not wallet_transaction_crud.delete_owned(db, id=transaction_id, user_id=current_user.id):
+        raise missing_or_forbidden(
+            wallet_transaction_crud, db, transaction_id, name="Wallet transaction", action="delete"
         )
-    
-    if transaction.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this wallet transaction"
-        )
-    
-    wallet_transaction_crud.delete(db, id=transaction_id)
     return None
 
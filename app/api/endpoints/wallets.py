@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, missing_or_forbidden
 from app.schemas.schemas import (
     WalletResponse,
     WalletCreate,
@@ -14,6 +15,9 @@ from app.models.models import User
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_WALLET_RESPONSE_FIELDS = tuple(WalletResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_wallets(
@@ -22,7 +26,7 @@ def list_wallets(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     search: Optional[str] = Query(None)
 ):
     """
@@ -38,13 +42,12 @@ def list_wallets(
         filters={},
         search=search,
         search_fields=["walletNumber", "currency"],
-        user_id=current_user.id
+        user_id=current_user.id,
+        columns=_WALLET_RESPONSE_FIELDS
     )
     
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [WalletResponse.model_validate(item) for item in result['items']]
-    
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/me", response_model=WalletResponse)
@@ -75,20 +78,10 @@ def get_wallet(
     """
     Get wallet by ID
     """
-    wallet = wallet_crud.get_by_id(db, id=wallet_id)
-    
+    # One query on the hit path; only a miss pays for the 403/404 lookup
+    wallet = wallet_crud.get_for_user(db, id=wallet_id, user_id=current_user.id)
     if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    if wallet.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this wallet"
-        )
-    
+        raise missing_or_forbidden(wallet_crud, db, wallet_id, name="Wallet", action="access")
     return wallet
 
 
@@ -102,16 +95,13 @@ def create_wallet(
     Create new wallet for current user
     Note: Each user can only have one wallet (one-to-one relationship)
     """
-    # Check if wallet already exists for user
-    existing_wallet = wallet_crud.get_by_user_id(db, user_id=current_user.id)
-    
-    if existing_wallet:
+    # The unique userId decides; no separate existence check to race against
+    wallet = wallet_crud.create_if_absent(db, obj_in=wallet_in, user_id=current_user.id)
+    if not wallet:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Wallet already exists for this user"
         )
-    
-    wallet = wallet_crud.create(db, obj_in=wallet_in, userId=current_user.id)
     return wallet
 
 
@@ -125,21 +115,15 @@ def update_wallet(
     """
     Update wallet
     """
-    wallet = wallet_crud.get_by_id(db, id=wallet_id)
-    
-    if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    if wallet.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this wallet"
-        )
-    
-    updated_wallet = wallet_crud.update(db, db_obj=wallet, obj_in=wallet_update)
+    # Ownership is part of the UPDATE; a miss is resolved to 403 or 404 after
+    updated_wallet = wallet_crud.update_returning(
+        db,
+        id=wallet_id,
+        values=wallet_update.model_dump(exclude_unset=True),
+        user_id=current_user.id
+    )
+    if not updated_wallet:
+        raise missing_or_forbidden(wallet_crud, db, wallet_id, name="Wallet", action="update")
     return updated_wallet
 
 
@@ -147,7 +131,7 @@ def update_wallet(
 def update_wallet_balance(
     wallet_id: str,
     amount: float = Query(..., description="Amount to add or subtract"),
-    operation: str = Query("add", regex="^(add|subtract|set)$", description="Operation: add, subtract, or set"),
+    operation: Literal["add", "subtract", "set"] = Query("add", description="Operation: add, subtract, or set"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -155,33 +139,21 @@ def update_wallet_balance(
     Update wallet balance
     Operations: add, subtract, or set (to a specific amount)
     """
-    wallet = wallet_crud.get_by_id(db, id=wallet_id)
-    
-    if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    if wallet.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this wallet"
-        )
-    
     updated_wallet = wallet_crud.update_balance(
         db,
         wallet_id=wallet_id,
         amount=amount,
-        operation=operation
+        operation=operation,
+        user_id=current_user.id
     )
-    
     if not updated_wallet:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update wallet balance"
-        )
-    
+        # Only the miss path looks again: an owned wallet here was short of funds
+        if operation == "subtract" and wallet_crud.get_for_user(db, id=wallet_id, user_id=current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient wallet balance"
+            )
+        raise missing_or_forbidden(wallet_crud, db, wallet_id, name="Wallet", action="update")
     return updated_wallet
 
 
@@ -194,20 +166,10 @@ def delete_wallet(
     """
     Delete wallet
     """
-    wallet = wallet_crud.get_by_id(db, id=wallet_id)
-    
+    # Loaded rather than bulk-deleted so the ORM cascades to its transactions
+    wallet = wallet_crud.get_for_user(db, id=wallet_id, user_id=current_user.id)
     if not wallet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    if wallet.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this wallet"
-        )
-    
-    wallet_crud.delete(db, id=wallet_id)
+        raise missing_or_forbidden(wallet_crud, db, wallet_id, name="Wallet", action="delete")
+    wallet_crud.remove(db, db_obj=wallet)
     return None
 
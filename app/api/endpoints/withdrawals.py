@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Literal
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, invalid_cursor, missing_or_forbidden
 from app.schemas.schemas import (
     WithdrawalResponse,
     WithdrawalCreate,
@@ -14,6 +15,9 @@ from app.models.models import User
 
 router = APIRouter()
 
+# Columns selected for list pages, so rows come back as plain dicts
+_WITHDRAWAL_RESPONSE_FIELDS = tuple(WithdrawalResponse.model_fields)
+
 
 @router.get("/", response_model=PaginatedResponse)
 def list_withdrawals(
@@ -22,39 +26,40 @@ def list_withdrawals(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    order: Literal["asc", "desc"] = Query("desc"),
     status: Optional[str] = Query(None),
     currency: Optional[str] = Query(None),
     method: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Count all matching rows; use has_more to page without it")
 ):
     """
     List withdrawals for current user with pagination and filtering
+    Pass the returned next_cursor back as cursor to page without OFFSET.
     """
-    filters: Dict[str, Any] = {}
-    if status:
-        filters["status"] = status
-    if currency:
-        filters["currency"] = currency
-    if method:
-        filters["method"] = method
+    filters = {k: v for k, v in (("status", status), ("currency", currency), ("method", method)) if v}
     
-    result = withdrawal_crud.get_multi(
-        db,
-        page=page,
-        per_page=per_page,
-        sort_by=sort_by,
-        order=order,
-        filters=filters,
-        search=search,
-        search_fields=["externalTransactionId", "walletAddress"],
-        user_id=current_user.id
-    )
-    
-    # Convert SQLAlchemy objects to Pydantic models
-    result['items'] = [WithdrawalResponse.model_validate(item) for item in result['items']]
+    try:
+        result = withdrawal_crud.get_multi(
+            db,
+            page=page,
+            per_page=per_page,
+            sort_by=sort_by,
+            order=order,
+            filters=filters,
+            search=search,
+            search_fields=["externalTransactionId", "walletAddress"],
+            user_id=current_user.id,
+            columns=_WITHDRAWAL_RESPONSE_FIELDS,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as exc:
+        raise invalid_cursor(exc)
     
-    return result
+    # Rows are already response-shaped; encode once with orjson
+    return ORJSONResponse(result)
 
 
 @router.get("/{withdrawal_id}", response_model=WithdrawalResponse)
@@ -66,20 +71,10 @@ def get_withdrawal(
     """
     Get withdrawal by ID
     """
-    withdrawal = withdrawal_crud.get_by_id(db, id=withdrawal_id)
-    
+    # One query on the hit path; only a miss pays for the 403/404 lookup
+    withdrawal = withdrawal_crud.get_for_user(db, id=withdrawal_id, user_id=current_user.id)
     if not withdrawal:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Withdrawal not found"
-        )
-    
-    if withdrawal.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this withdrawal"
-        )
-    
+        raise missing_or_forbidden(withdrawal_crud, db, withdrawal_id, name="Withdrawal", action="access")
     return withdrawal
 
 
@@ -126,21 +121,15 @@ def update_withdrawal(
     """
     Update withdrawal
     """
-    withdrawal = withdrawal_crud.get_by_id(db, id=withdrawal_id)
-    
-    if not withdrawal:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Withdrawal not found"
-        )
-    
-    if withdrawal.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this withdrawal"
-        )
-    
-    updated_withdrawal = withdrawal_crud.update(db, db_obj=withdrawal, obj_in=withdrawal_update)
+    # Ownership is part of the UPDATE; a miss is resolved to 403 or 404 after
+    updated_withdrawal = withdrawal_crud.update_returning(
+        db,
+        id=withdrawal_id,
+        values=withdrawal_update.model_dump(exclude_unset=True),
+        user_id=current_user.id
+    )
+    if not updated_withdrawal:
+        raise missing_or_forbidden(withdrawal_crud, db, withdrawal_id, name="Withdrawal", action="update")
     return updated_withdrawal
 
 
@@ -153,20 +142,10 @@ def delete_withdrawal(
     """
     Delete withdrawal
     """
-    withdrawal = withdrawal_crud.get_by_id(db, id=withdrawal_id)
-    
+    # Loaded rather than bulk-deleted so the ORM cascades to its transactions
+    withdrawal = withdrawal_crud.get_for_user(db, id=withdrawal_id, user_id=current_user.id)
     if not withdrawal:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Withdrawal not found"
-        )
-    
-    if withdrawal.userId != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this withdrawal"
-        )
-    
-    withdrawal_crud.delete(db, id=withdrawal_id)
+        raise missing_or_forbidden(withdrawal_crud, db, withdrawal_id, name="Withdrawal", action="delete")
+    withdrawal_crud.remove(db, db_obj=withdrawal)
     return None
 
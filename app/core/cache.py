@@ -0,0 +1,145 @@
+"""
+Shared key/value store for short-lived state (OTPs, counters, cached lookups).
+
+Uses Redis when REDIS_URL is configured so state is shared by every worker.
+Without it, a process-local store with the same TTL semantics is used, which
+is fine for a single worker or local development.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+
+class LocalCache:
+    """
+    In-process stand-in for the subset of Redis commands used by the app
+    """
+
+    def __init__(self):
+        # {key: (value, expires_at monotonic or None)}
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[str, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            return entry[0] if entry else None
+
+    def set(self, key: str, value, ex: Optional[int] = None, nx: bool = False) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if nx and self._live(key, now) is not None:
+                return False
+            self._data[key] = (str(value), now + ex if ex else None)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            now = time.monotonic()
+            removed = 0
+            for key in keys:
+                if self._live(key, now) is not None:
+                    del self._data[key]
+                    removed += 1
+            return removed
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            value = int(entry[0]) + amount if entry else amount
+            self._data[key] = (str(value), entry[1] if entry else None)
+            return value
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        with self._lock:
+            now = time.monotonic()
+            expired = [key for key, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
+
+
+_local_cache = LocalCache()
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the shared Redis client, or the process-local cache when
+    REDIS_URL is not configured. Both expose get/set(ex=, nx=)/delete/incr.
+    """
+    global _redis_client
+    if not settings.REDIS_URL:
+        return _local_cache
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                import redis
+
+                # Blocking pool: callers wait briefly for a free connection
+                # instead of failing when every connection is checked out
+                pool = redis.BlockingConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=32,
+                    timeout=5,
+                    decode_responses=True,
+                )
+                _redis_client = redis.Redis(connection_pool=pool)
+    return _redis_client
+
+
+def get_json(key: str) -> Optional[Any]:
+    """Return a JSON value stored with set_json, or None on a miss"""
+    raw = get_cache().get(key)
+    return orjson.loads(raw) if raw is not None else None
+
+
+def set_json(key: str, value: Any, ex: Optional[int] = None) -> None:
+    """Store a JSON-serializable value (datetimes allowed) under key"""
+    get_cache().set(key, orjson.dumps(value).decode(), ex=ex)
+
+
+def incr_window(key: str, window_seconds: int) -> int:
+    """
+    Increment a counter that expires window_seconds after its first hit and
+    return the new count. The first hit creates the key with its expiry
+    (SET NX EX) before INCR, which keeps the TTL, so a counter is never left
+    without one. Both commands exist on every Redis version, unlike EXPIRE NX
+    (7.0+), and go out in one pipeline.
+    """
+    client = get_cache()
+    if client is _local_cache:
+        client.set(key, 0, ex=window_seconds, nx=True)
+        return client.incr(key)
+    pipe = client.pipeline()
+    pipe.set(key, 0, ex=window_seconds, nx=True)
+    pipe.incr(key)
+    _, count = pipe.execute()
+    return count
+
+
+async def run_local_cache_reaper(interval_seconds: int = 60) -> None:
+    """
+    Periodically evict expired entries from the process-local cache, so keys
+    that are never read again (e.g. abandoned OTPs) don't accumulate.
+    Redis expires keys itself, so this is a no-op when REDIS_URL is set.
+    """
+    if settings.REDIS_URL:
+        return
+    while True:
+        await asyncio.sleep(interval_seconds)
+        _local_cache.purge_expired()
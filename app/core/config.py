@@ -1,5 +1,7 @@
 import os
+from functools import lru_cache
 from pathlib import Path
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Union, List
 import json
@@ -7,9 +9,15 @@ import json
 # Project root (repo root) so that `.env` at repository root is discovered
 # config.py is at app/core/config.py -> parents[2] points to repo root
 BASE_DIR = Path(__file__).resolve().parents[2]
+ENV_FILE = BASE_DIR / ".env"
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # SQLAlchemy connection pool (per worker process)
+    DATABASE_ENGINE_POOL_SIZE: int = 20
+    DATABASE_ENGINE_MAX_OVERFLOW: int = 10
+    DATABASE_ENGINE_POOL_TIMEOUT: int = 30
+    DATABASE_ENGINE_POOL_RECYCLE: int = 1800  # Seconds; stays under server/proxy idle timeouts
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -18,6 +26,12 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "CRM API"
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = ["*"]
+    # Worker threads available to sync (def) endpoints and dependencies.
+    # Every request that touches the database holds one for its whole duration.
+    THREADPOOL_SIZE: int = 40
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # 0 trusts no proxy header, so rate limits key on the socket peer address.
+    TRUSTED_PROXY_COUNT: int = 0
     
     # SMTP Email Configuration
     SMTP_HOST: str = ""
@@ -26,6 +40,7 @@ class Settings(BaseSettings):
     SMTP_PASS: str = ""
     SMTP_FROM: str = "Zuperior <noreply@zuperior.com>"
     SMTP_SECURE: bool = False
+    SMTP_POOL_SIZE: int = 4  # Persistent SMTP sessions kept per worker
     CLIENT_URL: str = "https://dashboard.zuperior.com"
     EMAIL_LOGO_URL: str = ""
     
@@ -42,20 +57,33 @@ class Settings(BaseSettings):
     MT5_API_URL: str = ""
     MT5_API_TOKEN: str = ""
 
-    def model_post_init(self, __context):
-        if isinstance(self.BACKEND_CORS_ORIGINS, str):
+    # Redis (optional) - shared OTP/cache store across workers.
+    # Leave empty to use the in-process store.
+    REDIS_URL: str = ""
+
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
+    def parse_cors_origins(cls, value):
+        """Accept a JSON list, "*" or a single origin, during validation"""
+        if isinstance(value, str):
             try:
-                self.BACKEND_CORS_ORIGINS = json.loads(self.BACKEND_CORS_ORIGINS)
+                return json.loads(value)
             except json.JSONDecodeError:
-                self.BACKEND_CORS_ORIGINS = (
-                    ["*"] if self.BACKEND_CORS_ORIGINS == "*" else [self.BACKEND_CORS_ORIGINS]
-                )
+                return ["*"] if value == "*" else [value]
+        return value
 
     model_config = SettingsConfigDict(
-        env_file=str(BASE_DIR / ".env"),  # 👈 explicit full path
+        env_file=str(ENV_FILE),  # 👈 explicit full path
         env_file_encoding="utf-8",
         case_sensitive=True,
         extra="ignore",  # Ignore env vars we don't explicitly declare
     )
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build Settings (reading .env) once per process"""
+    return Settings()
+
+
+settings = get_settings()
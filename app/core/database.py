@@ -1,3 +1,4 @@
+from functools import cache
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -30,17 +31,31 @@ def clean_database_url(url: str) -> str:
         return url
 
 
-# Clean the DATABASE_URL to remove invalid parameters
-database_url = clean_database_url(settings.DATABASE_URL)
+@cache
+def get_engine():
+    """
+    Build the process-wide engine on first use; later calls return the same
+    engine, so the URL is cleaned and the pool created exactly once.
+    """
+    # LIFO reuse keeps a small set of connections warm and lets the rest idle
+    # out; pre-ping and recycle drop connections the server or a proxy closed.
+    return create_engine(
+        clean_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_ENGINE_POOL_SIZE,
+        max_overflow=settings.DATABASE_ENGINE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_ENGINE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_ENGINE_POOL_RECYCLE,
+        pool_use_lifo=True
+    )
+
 
-engine = create_engine(
-    database_url,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+engine = get_engine()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects keep their loaded state across commit. A handler that commits and
+# then reads an attribute (or returns the object) doesn't re-SELECT the row;
+# code that needs server-side values calls db.refresh explicitly.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
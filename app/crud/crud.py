@@ -1,23 +1,80 @@
-from typing import Generic, TypeVar, Type, Optional, List, Dict, Any
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, asc, desc
+from typing import Generic, TypeVar, Type, Optional, List, Dict, Any, Sequence, Tuple, Union
+from datetime import datetime
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import or_, asc, desc, func, select, insert, update, delete, literal, tuple_, inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel
 from app.core.database import Base
-import math
+import base64
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Encode a (createdAt, id) keyset position as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor from encode_cursor; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), id
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        mapper = sa_inspect(model)
+        self._column_keys = frozenset(mapper.column_attrs.keys())
+        # Queryable attributes by name (columns, plus hybrids such as
+        # Ticket.userId), resolved once instead of hasattr/getattr per request
+        self._cols = {
+            key: getattr(model, key)
+            for key in mapper.all_orm_descriptors.keys()
+            if key not in mapper.relationships
+        }
     
-    def get_by_id(self, db: Session, id: str) -> Optional[ModelType]:
-        """Get a single record by ID"""
-        return db.query(self.model).filter(self.model.id == id).first()
+    def get_by_id(self, db: Session, id: Any, *, options: Sequence[Any] = ()) -> Optional[ModelType]:
+        """
+        Get a single record by ID. options are loader options (e.g.
+        selectinload(Model.children)) for relationships the caller will read.
+        A row already loaded in this session comes from the identity map
+        without another SELECT.
+        """
+        return db.get(self.model, id, options=options or None)
+    
+    def get_by_unique(self, db: Session, field: str, value: Any) -> Optional[ModelType]:
+        """
+        Get the row whose unique field equals value. Hits are remembered on
+        the session (one per request), so repeated lookups of the same key
+        in a request, e.g. auth then handler, issue one SELECT. Misses are
+        not remembered, and neither is a row that has since left the
+        session (deleted, or detached by update_returning) or whose field
+        no longer holds value (e.g. an email changed in this request).
+        """
+        memo = db.info.setdefault("crud_unique_lookups", {})
+        key = (self.model, field, value)
+        obj = memo.get(key)
+        if obj is not None and obj in db and getattr(obj, field) == value:
+            return obj
+        obj = db.query(self.model).filter(self._cols[field] == value).first()
+        if obj is not None:
+            memo[key] = obj
+        return obj
+    
+    def get_for_user(self, db: Session, *, id: Any, user_id: str) -> Optional[ModelType]:
+        """Get a record by ID only if it belongs to user_id, in a single query"""
+        return db.query(self.model).filter(
+            self.model.id == id,
+            self.model.userId == user_id
+        ).first()
     
     def get_multi(
         self,
@@ -31,74 +88,151 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         search: Optional[str] = None,
         search_fields: Optional[List[str]] = None,
         user_id: Optional[str] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        options: Sequence[Any] = (),
+        join: Optional[Tuple[Any, Any]] = None,
+        where: Sequence[Any] = (),
     ) -> Dict[str, Any]:
         """
-        Get multiple records with pagination, filtering, sorting, and search
+        Get multiple records with pagination, filtering, sorting, and search.
+        When columns is given, only those columns are selected and items are
+        plain dicts instead of ORM objects. Otherwise relationships on the
+        returned objects are not loadable (raiseload) unless options eager
+        loads them, e.g. options=(selectinload(Ticket.replies),), which
+        fetches them for the whole page in one more query.
+        
+        In the default (createdAt, id) newest-first order, next_cursor is set
+        when more rows follow; passing it back as cursor continues after the
+        last row without OFFSET. Cursor pages carry no total. Raises
+        ValueError for a malformed cursor or one combined with sort_by.
+        
+        With include_total=False the count is skipped and total is None;
+        has_more still says whether another page follows.
+        
+        join=(Target, onclause) and where=(criteria, ...) scope the rows
+        through another table, e.g. to the owner of a parent row.
         """
         query = db.query(self.model)
+        if join is not None:
+            query = query.join(*join)
+        if where:
+            query = query.filter(*where)
         
         # Apply user filter if provided (for user-specific data)
-        if user_id and hasattr(self.model, 'userId'):
-            query = query.filter(self.model.userId == user_id)
+        cols = self._cols
+        if user_id and 'userId' in cols:
+            query = query.filter(cols['userId'] == user_id)
         
         # Apply filters
         if filters:
             for field, value in filters.items():
-                if hasattr(self.model, field) and value is not None:
-                    query = query.filter(getattr(self.model, field) == value)
+                if field in cols and value is not None:
+                    query = query.filter(cols[field] == value)
         
-        # Apply search
+        # Apply search; '%term%' ILIKE can only use a trigram (gin_trgm_ops)
+        # index, so tables searched across all users should have one
         if search and search_fields:
             search_conditions = []
             for field in search_fields:
-                if hasattr(self.model, field):
+                if field in cols:
                     search_conditions.append(
-                        getattr(self.model, field).ilike(f"%{search}%")
+                        cols[field].ilike(f"%{search}%")
                     )
             if search_conditions:
                 query = query.filter(or_(*search_conditions))
         
-        # Get total count before pagination
-        total = query.count()
+        # Kept for the page-past-the-end fallback count below
+        filtered = query
         
         # Apply sorting
-        if sort_by and hasattr(self.model, sort_by):
+        sorted_by_field = bool(sort_by and sort_by in cols)
+        keyset = not sorted_by_field and 'createdAt' in cols
+        if sorted_by_field:
             if order.lower() == "asc":
-                query = query.order_by(asc(getattr(self.model, sort_by)))
+                query = query.order_by(asc(cols[sort_by]))
             else:
-                query = query.order_by(desc(getattr(self.model, sort_by)))
+                query = query.order_by(desc(cols[sort_by]))
+        elif keyset:
+            # Default newest first; id breaks ties so the cursor position is exact
+            query = query.order_by(desc(self.model.createdAt), desc(self.model.id))
+        
+        if cursor:
+            if not keyset:
+                raise ValueError("cursor cannot be combined with sort_by")
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(tuple_(self.model.createdAt, self.model.id) < (created_at, last_id))
+        
+        # Count matches in the same statement as the page (COUNT(*) OVER ());
+        # a cursor page only sees the rows after the cursor, so it isn't counted
+        count_total = include_total and not cursor
+        # Labelled so hybrids (e.g. Ticket.userId) come back under their own name
+        entities = [cols[c].label(c) for c in columns] if columns else [self.model]
+        if count_total:
+            entities.append(func.count().over().label("_total"))
+        query = query.with_entities(*entities)
+        if not columns:
+            # Pages are serialized from columns only; a relationship touched by
+            # mistake raises instead of lazily issuing one SELECT per row
+            query = query.options(*options, raiseload("*"))
+        
+        # Apply pagination; one extra row tells us whether a next page exists
+        offset = 0 if cursor else (page - 1) * per_page
+        rows = query.offset(offset).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if not count_total:
+            total = None
+        elif rows:
+            total = rows[0]._total
+        elif offset:
+            # An empty page past the end carries no count; ask separately
+            total = filtered.count()
         else:
-            # Default sorting by createdAt if available
-            if hasattr(self.model, 'createdAt'):
-                query = query.order_by(desc(self.model.createdAt))
+            total = 0
+        if columns:
+            items = [{c: row._mapping[c] for c in columns} for row in rows]
+        else:
+            items = [row[0] for row in rows]
         
-        # Apply pagination
-        offset = (page - 1) * per_page
-        items = query.offset(offset).limit(per_page).all()
+        next_cursor = None
+        if keyset and has_more:
+            last = rows[-1]._mapping if columns else rows[-1][0]
+            last_created_at = last.get("createdAt") if columns else last.createdAt
+            last_id = last.get("id") if columns else last.id
+            if last_created_at is not None and last_id is not None:
+                next_cursor = encode_cursor(last_created_at, last_id)
         
-        total_pages = math.ceil(total / per_page) if per_page > 0 else 0
+        total_pages = (total + per_page - 1) // per_page if total is not None and per_page > 0 else None
         
         return {
             "items": items,
             "total": total,
             "page": page,
             "per_page": per_page,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor,
+            "has_more": has_more
         }
     
     def create(self, db: Session, *, obj_in: CreateSchemaType, **kwargs) -> ModelType:
         """Create a new record"""
         obj_in_data = obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in.dict()
         obj_in_data.update(kwargs)
-        # Ensure timestamps for models that define them
-        if hasattr(self.model, 'createdAt') and not obj_in_data.get('createdAt'):
-            obj_in_data['createdAt'] = datetime.now(timezone.utc)
-        if hasattr(self.model, 'updatedAt') and not obj_in_data.get('updatedAt'):
-            obj_in_data['updatedAt'] = datetime.now(timezone.utc)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        # createdAt/updatedAt come from the database clock (column defaults)
+        return self.insert_returning(db, values=obj_in_data)
+    
+    def insert_returning(self, db: Session, *, values: Dict[str, Any], commit: bool = True) -> ModelType:
+        """
+        Insert one row with INSERT ... RETURNING and commit. Column defaults
+        (id, timestamps) come back in the same round-trip, so no refresh
+        SELECT follows. values are keyed by mapped attribute name.
+        With commit=False the row joins the caller's open transaction.
+        """
+        db_obj = db.execute(insert(self.model).values(**values).returning(self.model)).scalar_one()
+        if commit:
+            db.commit()
         return db_obj
     
     def update(
@@ -112,18 +246,107 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in.dict(exclude_unset=True)
         
         for field, value in obj_data.items():
-            if hasattr(db_obj, field):
+            if field in self._cols:
                 setattr(db_obj, field, value)
 
-        # Auto-update updatedAt if model supports it
-        if hasattr(db_obj, 'updatedAt'):
-            setattr(db_obj, 'updatedAt', datetime.now(timezone.utc))
-
+        # updatedAt is set to now() by the column's onupdate
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
     
+    def exists(self, db: Session, *, id: Any) -> bool:
+        """Whether a row with this id exists, without loading it"""
+        return db.query(self.model.id).filter(self.model.id == id).first() is not None
+    
+    def update_returning(
+        self,
+        db: Session,
+        *,
+        id: Any,
+        values: Dict[str, Any],
+        user_id: Optional[str] = None,
+        where: Tuple[Any, ...] = ()
+    ) -> Optional[ModelType]:
+        """
+        Update one row with UPDATE ... RETURNING and return it, or None if no
+        row has that id (and, when given, that owner and the extra where
+        conditions). The object comes back detached with every column
+        already loaded, so serializing it needs no refresh SELECT.
+        updatedAt is stamped by the column's onupdate (now()).
+        """
+        values = {field: value for field, value in values.items() if field in self._column_keys}
+        criteria = [self.model.id == id, *where]
+        if user_id is not None:
+            criteria.append(self.model.userId == user_id)
+        stmt = (
+            update(self.model)
+            .where(*criteria)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        db_obj = db.execute(stmt).scalar_one_or_none()
+        if db_obj is not None:
+            db.expunge(db_obj)
+        db.commit()
+        return db_obj
+    
+    def bulk_update(self, db: Session, *, filters: Dict[str, Any], values: Dict[str, Any]) -> int:
+        """
+        Apply values to every row matching the column == value filters with a
+        single UPDATE and one commit, returning how many rows changed. No
+        objects are loaded, so callers never need a per-row loop.
+        """
+        values = {field: value for field, value in values.items() if field in self._column_keys}
+        count = db.query(self.model).filter_by(**filters).update(values, synchronize_session=False)
+        db.commit()
+        return count
+    
+    def upsert(self, db: Session, *, conflict_cols: Sequence[str], values: Dict[str, Any]) -> ModelType:
+        """
+        Insert a row, or update the existing one that clashes on the unique
+        conflict_cols, as one INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+        Every other given column is overwritten. Atomic, so two concurrent
+        calls can't both insert.
+        """
+        values = {field: value for field, value in values.items() if field in self._column_keys}
+        columns = {field: self.model.__mapper__.column_attrs[field].columns[0] for field in values}
+        stmt = pg_insert(self.model).values(**values)
+        set_ = {
+            columns[field]: stmt.excluded[columns[field].key]
+            for field in values if field not in conflict_cols
+        }
+        # onupdate is not applied to ON CONFLICT DO UPDATE, so stamp it here
+        if 'updatedAt' in self._column_keys:
+            set_[self.model.__mapper__.column_attrs['updatedAt'].columns[0]] = func.now()
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[self._cols[field] for field in conflict_cols],
+                set_=set_
+            )
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        db_obj = db.execute(stmt).scalar_one()
+        db.commit()
+        return db_obj
+    
+    def delete_owned(self, db: Session, *, id: Any, user_id: str) -> bool:
+        """
+        Delete a row only if user_id owns it, in one DELETE ... RETURNING.
+        Returns False when no row matched (missing or someone else's).
+        """
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id, self.model.userId == user_id)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = db.execute(stmt).first() is not None
+        db.commit()
+        return deleted
+    
     def delete(self, db: Session, *, id: str) -> Optional[ModelType]:
         """Delete a record"""
         obj = db.query(self.model).filter(self.model.id == id).first()
@@ -131,6 +354,22 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.delete(obj)
             db.commit()
         return obj
+    
+    def remove(self, db: Session, *, db_obj: ModelType) -> ModelType:
+        """Delete an already loaded record"""
+        db.delete(db_obj)
+        db.commit()
+        return db_obj
+    
+    def delete_by_id(self, db: Session, *, id: Any) -> bool:
+        """
+        Delete a record with a single DELETE statement, without loading it first.
+        Returns False if no row matched. ORM-level cascades are not applied, so
+        only use this for models whose rows have no dependent relationships.
+        """
+        deleted = db.query(self.model).filter(self.model.id == id).delete(synchronize_session=False)
+        db.commit()
+        return deleted > 0
 
 
 # Import models
@@ -138,7 +377,7 @@ from app.models.models import (
     User, KYC, MT5Account, MT5Transaction, 
     Deposit, Withdrawal, PaymentMethod, Account, Transaction,
     Wallet, WalletTransaction, Notification, Ticket, TicketReply,
-    Country, GroupManagement
+    Country, GroupManagement, generate_uuid
 )
 from app.schemas.schemas import (
     UserCreate, UserUpdate,
@@ -162,12 +401,12 @@ from app.schemas.schemas import (
 
 class UserCRUD(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
-        """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        """Get user by email (memoized for the request, see get_by_unique)"""
+        return self.get_by_unique(db, "email", email)
     
     def get_by_client_id(self, db: Session, client_id: str) -> Optional[User]:
-        """Get user by clientId"""
-        return db.query(User).filter(User.clientId == client_id).first()
+        """Get user by clientId (memoized for the request, see get_by_unique)"""
+        return self.get_by_unique(db, "clientId", client_id)
 
 
 class KYCCRUD(CRUDBase[KYC, KYCCreate, KYCUpdate]):
@@ -181,6 +420,23 @@ class MT5AccountCRUD(CRUDBase[MT5Account, MT5AccountCreate, MT5AccountUpdate]):
         """Get MT5Account by accountId"""
         return db.query(MT5Account).filter(MT5Account.accountId == account_id).first()
 
+    def create_if_absent(self, db: Session, *, obj_in: MT5AccountCreate, **kwargs) -> Optional[MT5Account]:
+        """
+        Insert a new MT5 account in a single statement, relying on the unique
+        accountId constraint. Returns None if the accountId already exists.
+        """
+        values = obj_in.model_dump()
+        values.update(kwargs)
+        stmt = (
+            pg_insert(self.model)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[self.model.accountId])
+            .returning(self.model)
+        )
+        account = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return account
+
 
 class MT5TransactionCRUD(CRUDBase[MT5Transaction, MT5TransactionCreate, MT5TransactionUpdate]):
     pass
@@ -195,7 +451,9 @@ class WithdrawalCRUD(CRUDBase[Withdrawal, WithdrawalCreate, WithdrawalUpdate]):
 
 
 class PaymentMethodCRUD(CRUDBase[PaymentMethod, PaymentMethodCreate, PaymentMethodUpdate]):
-    pass
+    def update(self, db: Session, *, db_obj: PaymentMethod, obj_in: PaymentMethodUpdate) -> PaymentMethod:
+        """Update a loaded payment method in one UPDATE ... RETURNING"""
+        return self.update_returning(db, id=db_obj.id, values=obj_in.model_dump(exclude_unset=True))
 
 
 class AccountCRUD(CRUDBase[Account, AccountCreate, AccountUpdate]):
@@ -214,10 +472,12 @@ class AccountCRUD(CRUDBase[Account, AccountCreate, AccountUpdate]):
     def get_by_user_id(
         self, 
         db: Session, 
-        user_id: str
+        user_id: str,
+        *,
+        options: Sequence[Any] = ()
     ) -> List[Account]:
-        """Get all accounts for a user"""
-        return db.query(Account).filter(Account.userId == user_id).all()
+        """Get all accounts for a user; options eager load relationships (see get_multi)"""
+        return db.query(Account).options(*options).filter(Account.userId == user_id).all()
     
     def update_balance(
         self,
@@ -227,22 +487,14 @@ class AccountCRUD(CRUDBase[Account, AccountCreate, AccountUpdate]):
         amount: float,
         operation: str = "add"  # "add" or "subtract"
     ) -> Optional[Account]:
-        """Update account balance"""
-        account = self.get_by_id(db, id=account_id)
-        if not account:
-            return None
-        
+        """Update account balance in one UPDATE ... RETURNING, with the arithmetic in SQL"""
         if operation == "add":
-            account.balance += amount
+            balance = Account.balance + amount
         elif operation == "subtract":
-            account.balance -= amount
+            balance = Account.balance - amount
         else:
-            account.balance = amount
-        
-        db.add(account)
-        db.commit()
-        db.refresh(account)
-        return account
+            balance = amount
+        return self.update_returning(db, id=account_id, values={'balance': balance})
 
 
 class TransactionCRUD(CRUDBase[Transaction, TransactionCreate, TransactionUpdate]):
@@ -253,16 +505,7 @@ class TransactionCRUD(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         if 'metadata' in obj_in_data:
             obj_in_data['metadata_json'] = obj_in_data.pop('metadata')
         obj_in_data.update(kwargs)
-        # Ensure timestamps
-        if hasattr(self.model, 'createdAt') and not obj_in_data.get('createdAt'):
-            obj_in_data['createdAt'] = datetime.now(timezone.utc)
-        if hasattr(self.model, 'updatedAt') and not obj_in_data.get('updatedAt'):
-            obj_in_data['updatedAt'] = datetime.now(timezone.utc)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.insert_returning(db, values=obj_in_data)
     
     def update(
         self,
@@ -281,10 +524,6 @@ class TransactionCRUD(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
 
-        # Auto-update updatedAt if model supports it
-        if hasattr(db_obj, 'updatedAt'):
-            setattr(db_obj, 'updatedAt', datetime.now(timezone.utc))
-
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -292,6 +531,23 @@ class TransactionCRUD(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
 
 
 class WalletCRUD(CRUDBase[Wallet, WalletCreate, WalletUpdate]):
+    def create_if_absent(self, db: Session, *, obj_in: WalletCreate, user_id: str) -> Optional[Wallet]:
+        """
+        Create the user's wallet in a single statement, relying on the unique
+        userId constraint. Returns None if the user already has a wallet.
+        """
+        values = obj_in.model_dump()
+        values['userId'] = user_id
+        stmt = (
+            pg_insert(self.model)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[self.model.userId])
+            .returning(self.model)
+        )
+        wallet = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return wallet
+    
     def get_by_user_id(
         self, 
         db: Session, 
@@ -306,28 +562,45 @@ class WalletCRUD(CRUDBase[Wallet, WalletCreate, WalletUpdate]):
         *,
         wallet_id: str,
         amount: float,
-        operation: str = "add"  # "add", "subtract", or "set"
+        operation: str = "add",  # "add", "subtract", or "set"
+        user_id: Optional[str] = None
     ) -> Optional[Wallet]:
-        """Update wallet balance"""
-        wallet = self.get_by_id(db, id=wallet_id)
-        if not wallet:
-            return None
-        
+        """
+        Update wallet balance in one UPDATE ... RETURNING. The arithmetic runs
+        in SQL, so concurrent updates can't overwrite each other, and a
+        subtraction only applies while the balance covers it. Returns None if
+        no wallet matched (missing, not owned by user_id, or short of funds).
+        """
+        where = ()
         if operation == "add":
-            wallet.balance += amount
+            balance = Wallet.balance + amount
         elif operation == "subtract":
-            wallet.balance -= amount
+            balance = Wallet.balance - amount
+            where = (Wallet.balance >= amount,)
         else:  # set
-            wallet.balance = amount
-        
-        db.add(wallet)
-        db.commit()
-        db.refresh(wallet)
-        return wallet
+            balance = amount
+        return self.update_returning(db, id=wallet_id, values={'balance': balance}, user_id=user_id, where=where)
 
 
 class WalletTransactionCRUD(CRUDBase[WalletTransaction, WalletTransactionCreate, WalletTransactionUpdate]):
-    pass
+    def create_owned(self, db: Session, *, obj_in: WalletTransactionCreate, user_id: str) -> Optional[WalletTransaction]:
+        """
+        Insert a transaction only if its wallet belongs to user_id, as one
+        INSERT ... SELECT ... WHERE EXISTS ... RETURNING. Returns None when
+        nothing was inserted (wallet missing or someone else's).
+        """
+        data = {field: value for field, value in obj_in.model_dump().items() if field in self._column_keys}
+        # Timestamps are left to the column defaults, which from_select renders as now()
+        data.update(id=generate_uuid(), userId=user_id)
+        columns = self.model.__mapper__.columns
+        owned_wallet = select(Wallet.id).where(Wallet.id == obj_in.walletId, Wallet.userId == user_id).exists()
+        stmt = insert(self.model).from_select(
+            list(data),
+            select(*(literal(value, columns[field].type) for field, value in data.items())).where(owned_wallet)
+        ).returning(self.model)
+        db_obj = db.execute(stmt).scalars().first()
+        db.commit()
+        return db_obj
 
 
 class NotificationCRUD(CRUDBase[Notification, NotificationCreate, NotificationUpdate]):
@@ -338,44 +611,34 @@ class NotificationCRUD(CRUDBase[Notification, NotificationCreate, NotificationUp
         if 'metadata' in obj_in_data:
             obj_in_data['metadata_json'] = obj_in_data.pop('metadata')
         obj_in_data.update(kwargs)
-        if hasattr(self.model, 'createdAt') and not obj_in_data.get('createdAt'):
-            obj_in_data['createdAt'] = datetime.now(timezone.utc)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.insert_returning(db, values=obj_in_data)
     
-    def mark_as_read(self, db: Session, *, notification_id: str) -> Optional[Notification]:
-        """Mark notification as read"""
-        notification = self.get_by_id(db, id=notification_id)
-        if not notification:
-            return None
-        notification.isRead = True
-        notification.readAt = datetime.now(timezone.utc)
-        db.add(notification)
-        db.commit()
-        db.refresh(notification)
-        return notification
+    def update(self, db: Session, *, db_obj: Notification, obj_in: NotificationUpdate) -> Notification:
+        """Update a loaded notification in one UPDATE ... RETURNING"""
+        return self.update_returning(db, id=db_obj.id, values=obj_in.model_dump(exclude_unset=True))
+    
+    def mark_as_read(self, db: Session, *, notification: Notification) -> Notification:
+        """Mark a loaded notification as read"""
+        return self.update_returning(
+            db,
+            id=notification.id,
+            values={'isRead': True, 'readAt': func.now()}
+        )
     
     def mark_all_as_read(self, db: Session, *, user_id: str) -> int:
-        """Mark all notifications as read for a user"""
-        count = db.query(self.model).filter(
-            self.model.userId == user_id,
-            self.model.isRead == False
-        ).update({
-            'isRead': True,
-            'readAt': datetime.now(timezone.utc)
-        })
-        db.commit()
-        return count
+        """
+        Mark all notifications as read for a user with a single UPDATE and
+        return how many rows changed. No notification objects are loaded.
+        """
+        # Served by idx_notification_user_read (userId, isRead)
+        return self.bulk_update(
+            db,
+            filters={'userId': user_id, 'isRead': False},
+            values={'isRead': True, 'readAt': func.now()}
+        )
 
 
 class TicketCRUD(CRUDBase[Ticket, TicketCreate, TicketUpdate]):
-    def get_by_id(self, db: Session, id: int) -> Optional[Ticket]:
-        """Get a single record by ID (overridden for integer IDs)"""
-        return db.query(self.model).filter(self.model.id == id).first()
-    
     def create(self, db: Session, *, obj_in: TicketCreate, **kwargs) -> Ticket:
         """Create a new ticket with ticket number generation"""
         import uuid
@@ -393,19 +656,13 @@ class TicketCRUD(CRUDBase[Ticket, TicketCreate, TicketUpdate]):
         if 'userId' in obj_in_data:
             obj_in_data['parentId'] = obj_in_data.pop('userId')
         obj_in_data.update(kwargs)
-        if hasattr(self.model, 'createdAt') and not obj_in_data.get('createdAt'):
-            obj_in_data['createdAt'] = datetime.now(timezone.utc)
-        if hasattr(self.model, 'updatedAt') and not obj_in_data.get('updatedAt'):
-            obj_in_data['updatedAt'] = datetime.now(timezone.utc)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.insert_returning(db, values=obj_in_data)
     
-    def get_by_ticket_no(self, db: Session, ticket_no: str) -> Optional[Ticket]:
-        """Get ticket by ticket number"""
-        return db.query(self.model).filter(self.model.ticketNo == ticket_no).first()
+    def get_by_ticket_no(self, db: Session, ticket_no: str, *, options: Sequence[Any] = ()) -> Optional[Ticket]:
+        """Get ticket by ticket number; pass options=(selectinload(Ticket.replies),) to read replies"""
+        if not options:
+            return self.get_by_unique(db, "ticketNo", ticket_no)
+        return db.query(self.model).options(*options).filter(self.model.ticketNo == ticket_no).first()
     
     def delete(self, db: Session, *, id: int) -> Optional[Ticket]:
         """Delete a record by ID (overridden for integer IDs)"""
@@ -415,42 +672,25 @@ class TicketCRUD(CRUDBase[Ticket, TicketCreate, TicketUpdate]):
             db.commit()
         return obj
     
-    def update(self, db: Session, *, db_obj: Ticket, obj_in: TicketUpdate) -> Ticket:
-        """Update ticket with tags JSON field handling"""
-        obj_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in.dict(exclude_unset=True)
-        # Handle tags JSON field
-        if 'tags' in obj_data and isinstance(obj_data['tags'], list):
-            # Store as JSON - SQLAlchemy will handle JSON serialization
-            pass
-        for field, value in obj_data.items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
-        if hasattr(db_obj, 'updatedAt'):
-            setattr(db_obj, 'updatedAt', datetime.now(timezone.utc))
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+    def update(self, db: Session, *, db_obj: Ticket, obj_in: Union[TicketUpdate, Dict[str, Any]]) -> Ticket:
+        """Update ticket with tags JSON field handling; obj_in may be an already filtered dict"""
+        if isinstance(obj_in, dict):
+            obj_data = obj_in
+        else:
+            obj_data = obj_in.model_dump(exclude_unset=True)
+        # tags is a JSON column, so a list is stored as-is
+        return self.update_returning(db, id=db_obj.id, values=obj_data)
     
     def close_ticket(self, db: Session, *, ticket_id: int, closed_by: str) -> Optional[Ticket]:
-        """Close a ticket"""
-        ticket = self.get_by_id(db, id=ticket_id)
-        if not ticket:
-            return None
-        ticket.status = "Closed"
-        ticket.closedAt = datetime.now(timezone.utc)
-        ticket.closedBy = closed_by
-        db.add(ticket)
-        db.commit()
-        db.refresh(ticket)
-        return ticket
+        """Close a ticket in one UPDATE ... RETURNING; None if it doesn't exist"""
+        return self.update_returning(
+            db,
+            id=ticket_id,
+            values={'status': "Closed", 'closedAt': func.now(), 'closedBy': closed_by}
+        )
 
 
 class TicketReplyCRUD(CRUDBase[TicketReply, TicketReplyCreate, TicketReplyUpdate]):
-    def get_by_id(self, db: Session, id: int) -> Optional[TicketReply]:
-        """Get a single record by ID (overridden for integer IDs)"""
-        return db.query(self.model).filter(self.model.id == id).first()
-    
     def create(self, db: Session, *, obj_in: TicketReplyCreate, **kwargs) -> TicketReply:
         """Create a new ticket reply with attachments JSON field handling"""
         obj_in_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in.dict(exclude_unset=True)
@@ -469,31 +709,45 @@ class TicketReplyCRUD(CRUDBase[TicketReply, TicketReplyCreate, TicketReplyUpdate
         if 'ticketId' in obj_in_data:
             obj_in_data['ticketId'] = int(obj_in_data['ticketId']) if isinstance(obj_in_data['ticketId'], str) else obj_in_data['ticketId']
         obj_in_data.update(kwargs)
-        if hasattr(self.model, 'createdAt') and not obj_in_data.get('createdAt'):
-            obj_in_data['createdAt'] = datetime.now(timezone.utc)
-        if hasattr(self.model, 'updatedAt') and not obj_in_data.get('updatedAt'):
-            obj_in_data['updatedAt'] = datetime.now(timezone.utc)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        
-        # Update ticket's lastReplyAt
-        from app.models.models import Ticket
-        ticket = db.query(Ticket).filter(Ticket.id == db_obj.ticketId).first()
-        if ticket:
-            ticket.lastReplyAt = datetime.now(timezone.utc)
-            db.add(ticket)
-            db.commit()
+        db_obj = self.insert_returning(db, values=obj_in_data, commit=False)
         
+        # Bump the ticket's lastReplyAt in the same transaction, so the reply
+        # and the timestamp commit together; no need to load the ticket first
+        db.execute(
+            update(Ticket)
+            .where(Ticket.id == db_obj.ticketId)
+            .values(lastReplyAt=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
         return db_obj
     
-    def get_by_ticket_id(self, db: Session, ticket_id: int) -> List[TicketReply]:
-        """Get all replies for a ticket"""
+    def get_for_ticket(self, db: Session, *, reply_id: int, ticket_id: int) -> Optional[TicketReply]:
+        """Get a reply by ID only if it belongs to ticket_id, in a single query"""
+        return db.query(self.model).filter(
+            self.model.id == reply_id,
+            self.model.ticketId == ticket_id
+        ).first()
+    
+    def get_by_ticket_id(
+        self,
+        db: Session,
+        ticket_id: int,
+        include_internal: bool = True,
+        *,
+        options: Sequence[Any] = ()
+    ) -> List[TicketReply]:
+        """
+        Get a ticket's replies in order, optionally leaving out internal notes.
+        options eager load relationships read off each reply (see get_multi).
+        """
         # Handle string ticket_id for backward compatibility
         if isinstance(ticket_id, str):
             ticket_id = int(ticket_id)
-        return db.query(self.model).filter(self.model.ticketId == ticket_id).order_by(self.model.createdAt).all()
+        query = db.query(self.model).options(*options).filter(self.model.ticketId == ticket_id)
+        if not include_internal:
+            query = query.filter(self.model.isInternal.is_not(True))
+        return query.order_by(self.model.createdAt).all()
     
     def delete(self, db: Session, *, id: int) -> Optional[TicketReply]:
         """Delete a record by ID (overridden for integer IDs)"""
@@ -506,19 +760,8 @@ class TicketReplyCRUD(CRUDBase[TicketReply, TicketReplyCreate, TicketReplyUpdate
     def update(self, db: Session, *, db_obj: TicketReply, obj_in: TicketReplyUpdate) -> TicketReply:
         """Update ticket reply with attachments JSON field handling"""
         obj_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in.dict(exclude_unset=True)
-        # Handle attachments JSON field
-        if 'attachments' in obj_data and isinstance(obj_data['attachments'], list):
-            # Store as JSON - SQLAlchemy will handle JSON serialization
-            pass
-        for field, value in obj_data.items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
-        if hasattr(db_obj, 'updatedAt'):
-            setattr(db_obj, 'updatedAt', datetime.now(timezone.utc))
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        # attachments is a JSON column, so a list is stored as-is
+        return self.update_returning(db, id=db_obj.id, values=obj_data)
 
 
 class CountryCRUD(CRUDBase[Country, CountryCreate, CountryUpdate]):
@@ -528,10 +771,6 @@ class CountryCRUD(CRUDBase[Country, CountryCreate, CountryUpdate]):
 
 
 class GroupManagementCRUD(CRUDBase[GroupManagement, GroupManagementCreate, GroupManagementUpdate]):
-    def get_by_id(self, db: Session, id: int) -> Optional[GroupManagement]:
-        """Get a single record by ID (overridden for integer IDs)"""
-        return db.query(self.model).filter(self.model.id == id).first()
-
     def get_by_group(self, db: Session, group: str) -> Optional[GroupManagement]:
         """Get group by group name"""
         return db.query(self.model).filter(self.model.group == group).first()
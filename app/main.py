@@ -1,8 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
+import anyio
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
+from app.core.config import settings, ENV_FILE
 from app.core.database import engine, Base
+from app.core.cache import run_local_cache_reaper
 from app.api import auth
 from app.api.endpoints import (
     users,
@@ -24,14 +29,34 @@ from app.api.endpoints import (
 # Suppress noisy passlib bcrypt version warning (harmless)
 logging.getLogger("passlib.handlers.bcrypt").setLevel(logging.ERROR)
 
+logger = logging.getLogger(__name__)
+
 # Note: We do NOT create tables here to avoid modifying the existing database
 # The database schema is managed by Prisma migrations
 # Base.metadata.create_all(bind=engine)  # Commented out to preserve existing DB structure
 print("DATABASE_URL:", settings.DATABASE_URL[:50] + "..." if len(settings.DATABASE_URL) > 50 else settings.DATABASE_URL)
 print("SECRET_KEY:", settings.SECRET_KEY[:20] + "..." if len(settings.SECRET_KEY) > 20 else settings.SECRET_KEY)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start and stop process-wide background tasks
+    """
+    logger.info("Settings loaded from: %s", ENV_FILE if ENV_FILE.is_file() else "process environment (no .env file)")
+    # Sync endpoints (all database-backed routes) run on AnyIO's worker threads
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    cache_reaper = asyncio.create_task(run_local_cache_reaper())
+    yield
+    cache_reaper.cancel()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    # orjson encodes every response, including ones built from response_model
+    default_response_class=ORJSONResponse,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc"
@@ -49,7 +74,7 @@ app.add_middleware(
 
 # Health check endpoint
 @app.get("/health")
-def health_check():
+async def health_check():
     """
     Health check endpoint
     """
@@ -58,7 +83,7 @@ def health_check():
 
 # Root endpoint
 @app.get("/")
-def root():
+async def root():
     """
     Root endpoint
     """
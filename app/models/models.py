@@ -88,7 +88,7 @@ class KYC(Base):
     addressSubmittedAt = Column(DateTime(timezone=True), nullable=True)
     rejectionReason = Column(String, nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     userId = Column(String, ForeignKey("User.id"), unique=True, nullable=False)
     
     # Relationships
@@ -103,7 +103,7 @@ class MT5Account(Base):
     userId = Column(String, ForeignKey("User.id"), nullable=True)
     accountType = Column(String, default="Live", nullable=False)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     password = Column(String, nullable=True)
     leverage = Column(Integer, nullable=True)
     nameOnAccount = Column(String, nullable=True)
@@ -122,6 +122,11 @@ class MT5Account(Base):
     withdrawals = relationship("Withdrawal", back_populates="mt5Account", cascade="all, delete-orphan")
     user = relationship("User", back_populates="mt5Accounts")
     mt5Transactions = relationship("MT5Transaction", back_populates="mt5Account", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Backs per-user listing ordered by newest first
+        Index('idx_mt5account_user_created', 'userId', 'createdAt'),
+    )
 
 
 class MT5Transaction(Base):
@@ -142,10 +147,15 @@ class MT5Transaction(Base):
     userId = Column(String, nullable=True, index=True)
     processedBy = Column(String, nullable=True)
     processedAt = Column(DateTime(timezone=True), nullable=True)
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     mt5Account = relationship("MT5Account", back_populates="mt5Transactions")
+    
+    __table_args__ = (
+        # Backs per-account listing ordered by newest first
+        Index('idx_mt5transaction_account_created', 'mt5AccountId', 'createdAt'),
+    )
 
 
 class Deposit(Base):
@@ -171,7 +181,7 @@ class Deposit(Base):
     rejectedAt = Column(DateTime(timezone=True), nullable=True)
     processedAt = Column(DateTime(timezone=True), nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="deposits")
@@ -195,7 +205,7 @@ class Withdrawal(Base):
     approvedAt = Column(DateTime(timezone=True), nullable=True)
     rejectedAt = Column(DateTime(timezone=True), nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     currency = Column(String, default="USD")
     externalTransactionId = Column(String, nullable=True)
     paymentMethod = Column(String, nullable=True)
@@ -203,6 +213,12 @@ class Withdrawal(Base):
     walletAddress = Column(String, nullable=True)
     walletId = Column(String, ForeignKey("Wallet.id"), nullable=True)
     
+    __table_args__ = (
+        # Back per-user listing newest first, unfiltered and by status
+        Index('idx_withdrawal_user_created', 'userId', 'createdAt', 'id'),
+        Index('idx_withdrawal_user_status_created', 'userId', 'status', 'createdAt'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="withdrawals")
     mt5Account = relationship("MT5Account", back_populates="withdrawals")
@@ -233,7 +249,7 @@ class PaymentMethod(Base):
     approvedBy = Column(String, nullable=True)
     rejectionReason = Column(String, nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
 
 class Account(Base):
@@ -244,7 +260,7 @@ class Account(Base):
     accountType = Column(String, nullable=False)
     balance = Column(Float, default=0.0, nullable=False)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="accounts")
@@ -265,7 +281,7 @@ class Transaction(Base):
     metadata_json = Column("metadata", Text, nullable=True)  # Python attr 'metadata_json' maps to DB column 'metadata' to avoid SQLAlchemy reserved word conflict
     depositId = Column(String, ForeignKey("Deposit.id"), nullable=True, index=True)
     withdrawalId = Column(String, ForeignKey("Withdrawal.id"), nullable=True, index=True)
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -283,7 +299,7 @@ class Wallet(Base):
     walletNumber = Column(String, unique=True, nullable=True)
     currency = Column(String, default="USD", nullable=False)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="wallet")
@@ -304,7 +320,14 @@ class WalletTransaction(Base):
     mt5AccountId = Column(String, nullable=True)
     withdrawalId = Column(String, nullable=True, index=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Back per-user listing newest first, unfiltered, by status and by wallet
+        Index('idx_wallet_transaction_user_created', 'userId', 'createdAt', 'id'),
+        Index('idx_wallet_transaction_user_status_created', 'userId', 'status', 'createdAt'),
+        Index('idx_wallet_transaction_user_wallet_created', 'userId', 'walletId', 'createdAt'),
+    )
     
     # Relationships
     wallet = relationship("Wallet", back_populates="transactions")
@@ -337,7 +360,7 @@ class DefaultMT5Account(Base):
     userId = Column(String, ForeignKey("User.id"), unique=True, nullable=False)
     mt5AccountId = Column(String, ForeignKey("MT5Account.accountId"), nullable=False, index=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="defaultMT5Account")
@@ -363,7 +386,7 @@ class Instrument(Base):
     tradingHours = Column(String, nullable=True)
     lastUpdated = Column(DateTime(timezone=True), nullable=False)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column(DateTime(timezone=True), nullable=False)
+    updatedAt = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
     
     # Relationships
     userFavorites = relationship("UserFavorite", back_populates="instrument", cascade="all, delete-orphan")
@@ -418,6 +441,13 @@ class Notification(Base):
     
     # Relationships
     user = relationship("User", back_populates="notifications")
+    
+    __table_args__ = (
+        # Lets the per-user unread count be answered from the index alone
+        Index('idx_notification_user_read', 'userId', 'isRead'),
+        # Newest-first (createdAt, id) keyset pages seek straight to the cursor
+        Index('idx_notification_user_created', 'userId', 'createdAt', 'id'),
+    )
 
 
 class Ticket(Base):
@@ -435,7 +465,7 @@ class Ticket(Base):
     accountNumber = Column("account_number", String(50), nullable=True)
     tags = Column(ARRAY(String), nullable=True, default=[])  # Array of strings
     createdAt = Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True)
-    updatedAt = Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column("updated_at", DateTime(timezone=True), default=func.now(), onupdate=func.now())
     lastReplyAt = Column("last_reply_at", DateTime(timezone=True), nullable=True)
     closedAt = Column("closed_at", DateTime(timezone=True), nullable=True)
     closedBy = Column("closed_by", String(255), nullable=True)
@@ -443,6 +473,14 @@ class Ticket(Base):
     # Relationships
     replies = relationship("TicketReply", back_populates="ticket", cascade="all, delete-orphan", order_by="TicketReply.createdAt")
     
+    __table_args__ = (
+        # Trigram indexes (pg_trgm) let the admin-wide '%term%' ILIKE search
+        # use an index instead of scanning every ticket
+        Index('idx_ticket_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_ticket_description_trgm', 'description', postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}),
+        Index('idx_ticket_no_trgm', 'ticket_no', postgresql_using='gin', postgresql_ops={'ticket_no': 'gin_trgm_ops'}),
+    )
+    
     # Property for backward compatibility - maps userId to parentId
     @hybrid_property
     def userId(self):
@@ -466,9 +504,14 @@ class TicketReply(Base):
     isInternal = Column("is_internal", Boolean, default=False)  # Internal notes visible only to admins
     attachments = Column(ARRAY(String), nullable=True, default=[])  # Array of file URLs
     createdAt = Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True)
-    updatedAt = Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column("updated_at", DateTime(timezone=True), default=func.now(), onupdate=func.now())
     isRead = Column("is_read", Boolean, default=False)
     
+    __table_args__ = (
+        # Backs a ticket's thread in order, with internal notes skipped in the index
+        Index('idx_ticket_reply_ticket_internal_created', 'ticket_id', 'is_internal', 'created_at'),
+    )
+    
     # Relationships
     ticket = relationship("Ticket", back_populates="replies", foreign_keys=[ticketId])
     parentReply = relationship("TicketReply", remote_side=[id], foreign_keys=[replyId])
@@ -494,7 +537,7 @@ class Country(Base):
     region = Column(String(50), nullable=True)
     isActive = Column("isActive", Boolean, default=True, index=True)
     createdAt = Column("createdAt", DateTime(timezone=True), server_default=func.now())
-    updatedAt = Column("updatedAt", DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updatedAt = Column("updatedAt", DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
 
 class GroupManagement(Base):
@@ -515,5 +558,5 @@ class GroupManagement(Base):
     is_active = Column(Boolean, default=True, index=True)
     synced_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
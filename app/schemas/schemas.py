@@ -22,10 +22,12 @@ class TokenData(BaseModel):
 # ============ Pagination Schema ============
 class PaginatedResponse(BaseModel):
     items: List[Any]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
 
 
 # ============ User Schemas ============
@@ -5,14 +5,91 @@ from email.mime.base import MIMEBase
 from email import encoders
 import base64
 import logging
-from typing import Optional, List, Dict, Any
+import queue
+import time
+from typing import Optional, List, Dict, Any, Tuple
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-def send_email_to(to: str, subject: str, text: str, html: str, attachments: Optional[List[Dict[str, Any]]] = None) -> bool:
+# Authenticated SMTP sessions kept open between sends so each email does not
+# pay for a fresh TCP + TLS handshake and login. Entries are (session, last_used).
+SMTP_KEEPALIVE_SECONDS = 30
+_smtp_pool: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue(maxsize=settings.SMTP_POOL_SIZE)
+
+
+def _smtp_connect() -> smtplib.SMTP:
+    """Open and authenticate a new SMTP session"""
+    # Use SMTP_SSL if SMTP_SECURE is True, otherwise use STARTTLS
+    if settings.SMTP_SECURE:
+        server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT)
+    else:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+        server.starttls()
+    server.login(settings.SMTP_USER, settings.SMTP_PASS)
+    return server
+
+
+def _smtp_close(server: smtplib.SMTP) -> None:
+    """Close an SMTP session, ignoring errors from an already dead connection"""
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def _smtp_checkout() -> smtplib.SMTP:
     """
-    Send email using SMTP with optional attachments
+    Take an idle session from the pool, or open one if none is available.
+    Sessions idle longer than the keepalive window are probed with NOOP first,
+    since servers drop idle connections silently.
+    """
+    while True:
+        try:
+            server, last_used = _smtp_pool.get_nowait()
+        except queue.Empty:
+            return _smtp_connect()
+        if time.monotonic() - last_used < SMTP_KEEPALIVE_SECONDS:
+            return server
+        try:
+            if server.noop()[0] == 250:
+                return server
+        except smtplib.SMTPException:
+            pass
+        _smtp_close(server)
+
+
+def _smtp_checkin(server: smtplib.SMTP) -> None:
+    """Return a healthy session to the pool, closing it if the pool is full"""
+    try:
+        _smtp_pool.put_nowait((server, time.monotonic()))
+    except queue.Full:
+        _smtp_close(server)
+
+
+def _smtp_send(msg: MIMEMultipart) -> None:
+    """Send a message over a pooled session, reconnecting once if it was dropped"""
+    server = _smtp_checkout()
+    try:
+        server.send_message(msg)
+    except smtplib.SMTPServerDisconnected:
+        _smtp_close(server)
+        server = _smtp_connect()
+        try:
+            server.send_message(msg)
+        except Exception:
+            _smtp_close(server)
+            raise
+    except Exception:
+        # Don't hand a session in an unknown state back to the pool
+        _smtp_close(server)
+        raise
+    _smtp_checkin(server)
+
+
+def build_message(to: str, subject: str, text: str, html: str, attachments: Optional[List[Dict[str, Any]]] = None) -> MIMEMultipart:
+    """
+    Build a multipart/alternative message with optional attachments
     
     Args:
         to: Recipient email address
@@ -24,59 +101,104 @@ def send_email_to(to: str, subject: str, text: str, html: str, attachments: Opti
             - content: bytes or str (required) - file content
             - content_type: str (optional) - MIME type, defaults to 'application/octet-stream'
     """
+    msg = MIMEMultipart('alternative')
+    msg['From'] = settings.SMTP_FROM
+    msg['To'] = to
+    msg['Subject'] = subject
+    msg.attach(MIMEText(text, 'plain'))
+    msg.attach(MIMEText(html, 'html'))
+    
+    # Add attachments if provided
+    if attachments:
+        for attachment in attachments:
+            filename = attachment.get('filename')
+            content = attachment.get('content')
+            content_type = attachment.get('content_type', 'application/octet-stream')
+            
+            if not filename or content is None:
+                logger.warning(f'Skipping invalid attachment: missing filename or content')
+                continue
+            
+            # Handle base64 encoded content
+            if isinstance(content, str):
+                try:
+                    # Try to decode base64 string; validate so plain text isn't
+                    # silently mangled into garbage bytes
+                    content = base64.b64decode(content, validate=True)
+                except Exception:
+                    # If not base64, treat as plain text
+                    content = content.encode('utf-8')
+            elif not isinstance(content, bytes):
+                content = str(content).encode('utf-8')
+            
+            # Create attachment
+            part = MIMEBase(*content_type.split('/', 1))
+            part.set_payload(content)
+            encoders.encode_base64(part)
+            part.add_header(
+                'Content-Disposition',
+                f'attachment; filename= {filename}'
+            )
+            msg.attach(part)
+    
+    return msg
+
+
+def send_email_to(to: str, subject: str, text: str, html: str, attachments: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """
+    Send email using SMTP with optional attachments
+    
+    See build_message for the attachment format.
+    """
     try:
-        msg = MIMEMultipart('alternative')
-        msg['From'] = settings.SMTP_FROM
-        msg['To'] = to
-        msg['Subject'] = subject
-        msg.attach(MIMEText(text, 'plain'))
-        msg.attach(MIMEText(html, 'html'))
-        
-        # Add attachments if provided
-        if attachments:
-            for attachment in attachments:
-                filename = attachment.get('filename')
-                content = attachment.get('content')
-                content_type = attachment.get('content_type', 'application/octet-stream')
-                
-                if not filename or content is None:
-                    logger.warning(f'Skipping invalid attachment: missing filename or content')
-                    continue
-                
-                # Handle base64 encoded content
-                if isinstance(content, str):
-                    try:
-                        # Try to decode base64 string
-                        content = base64.b64decode(content)
-                    except Exception:
-                        # If not base64, treat as plain text
-                        content = content.encode('utf-8')
-                elif not isinstance(content, bytes):
-                    content = str(content).encode('utf-8')
-                
-                # Create attachment
-                part = MIMEBase(*content_type.split('/', 1))
-                part.set_payload(content)
-                encoders.encode_base64(part)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= {filename}'
-                )
-                msg.attach(part)
-        
-        # Use SMTP_SSL if SMTP_SECURE is True, otherwise use STARTTLS
-        if settings.SMTP_SECURE:
-            with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.login(settings.SMTP_USER, settings.SMTP_PASS)
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.starttls()
-                server.login(settings.SMTP_USER, settings.SMTP_PASS)
-                server.send_message(msg)
+        _smtp_send(build_message(to, subject, text, html, attachments))
         
         logger.info(f'Email sent to {to} with {len(attachments) if attachments else 0} attachment(s)')
         return True
     except Exception as e:
         logger.error(f'Failed to send email: {e}')
         raise
+
+
+def send_bulk_emails(messages: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Send several emails over a single pooled SMTP session
+    
+    Args:
+        messages: List of dicts with the send_email_to arguments
+            (to, subject, text, html and optional attachments)
+    
+    Returns:
+        Dict with the number of messages sent and failed
+    """
+    sent = 0
+    failed = 0
+    server = _smtp_checkout()
+    try:
+        for message in messages:
+            msg = build_message(**message)
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                _smtp_close(server)
+                try:
+                    server = _smtp_connect()
+                    server.send_message(msg)
+                except (smtplib.SMTPException, OSError) as e:
+                    # Count it and keep going; the next message reconnects again
+                    logger.error(f'Failed to resend email to {message.get("to")} after reconnect: {e}')
+                    failed += 1
+                    continue
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                # Rejected by the server, but the session is still usable
+                logger.error(f'Failed to send email to {message.get("to")}: {e}')
+                failed += 1
+                continue
+            sent += 1
+    except Exception:
+        _smtp_close(server)
+        raise
+    _smtp_checkin(server)
+    
+    logger.info(f'Bulk email finished: {sent} sent, {failed} failed')
+    return {"sent": sent, "failed": failed}
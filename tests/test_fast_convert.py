@@ -0,0 +1,33 @@
+"""
+RowSerializer.dump_page turns a get_multi result into a response body.
+"""
+from types import SimpleNamespace
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.fast_convert import RowSerializer
+
+
+class Item(BaseModel):
+    id: str
+    tags: Optional[List[str]] = None
+    metadata: Optional[dict] = None
+
+
+_rows = RowSerializer(Item, metadata="metadata_json")
+
+
+def page(items):
+    return {"items": items, "total": len(items), "page": 1, "per_page": 20, "total_pages": 1, "next_cursor": None, "has_more": False}
+
+
+def test_dump_page_dict_rows():
+    result = _rows.dump_page(page([{"id": "a", "tags": None, "metadata_json": {"k": 1}}]))
+    assert result["items"] == [{"id": "a", "tags": [], "metadata": {"k": 1}}]
+    assert result["total"] == 1 and result["has_more"] is False
+
+
+def test_dump_page_orm_rows():
+    result = _rows.dump_page(page([SimpleNamespace(id="b", tags=["x"], metadata_json=None)]))
+    assert result["items"] == [{"id": "b", "tags": ["x"], "metadata": None}]